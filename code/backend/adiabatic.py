@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.linalg import expm
+from hamiltonian import as_cost_diagonal
 
 def uniform_plus_state(n: int) -> np.ndarray:
     dim = 2 ** n
@@ -9,23 +9,24 @@ def simulate_continuous_adiabatic(H_P, H_M, T=6.0, steps=100):
     """
     Continuous-time adiabatic evolution with linear schedule:
       H(s) = (1 - s) H_M + s H_P,  s = t/T \in [0, 1]
+    H_P may be the dense problem Hamiltonian or its cost diagonal.
     Returns:
       times        : np.array of times
-      fidelities   : fidelity to ground state of H_P vs time
+      fidelities   : optimal-subspace fidelity vs time (optimal_subspace_fidelity)
       final_state  : state at t = T
     """
-    dim = H_P.shape[0]
+    from scipy.linalg import expm
+
+    diag_HP = as_cost_diagonal(H_P)
+    dim = diag_HP.shape[0]
     n = int(np.log2(dim))
     psi = uniform_plus_state(n)
-
-    # Ground state of H_P for fidelity reference (lowest eigenvalue)
-    evals, evecs = np.linalg.eigh(H_P)
-    gs = evecs[:, np.argmin(evals)]
+    H_P = np.diag(diag_HP)
 
     dt = T / steps
     times = np.linspace(0, T, steps + 1)
     fidelities = np.zeros(steps + 1)
-    fidelities[0] = np.abs(np.vdot(gs, psi)) ** 2
+    fidelities[0] = optimal_subspace_fidelity(psi, diag_HP)
 
     for t_idx in range(steps):
         t = times[t_idx]
@@ -33,10 +34,98 @@ def simulate_continuous_adiabatic(H_P, H_M, T=6.0, steps=100):
         H_t = (1.0 - s) * H_M + s * H_P
         U_dt = expm(-1j * H_t * dt)
         psi = U_dt @ psi
-        fidelities[t_idx + 1] = np.abs(np.vdot(gs, psi)) ** 2
+        fidelities[t_idx + 1] = optimal_subspace_fidelity(psi, diag_HP)
 
     return times, fidelities, psi
 
+def optimal_subspace_fidelity(psi, cost_diag, atol=1e-9):
+    """
+    Total probability of psi on the optimal-cut subspace, i.e. all basis
+    states attaining max(cost_diag). |+> is the highest eigenstate of
+    H_M = sum X, so the adiabatic path H(s) ends in this (degenerate)
+    subspace rather than in a single eigenvector. psi may carry leading
+    batch axes; a single state gives a float, a batch an array.
+    """
+    mask = cost_diag >= cost_diag.max() - atol
+    fid = np.sum(np.abs(psi[..., mask]) ** 2, axis=-1)
+    return float(fid) if np.ndim(fid) == 0 else fid
+
+def _mixer_sparse(n):
+    from scipy.sparse import csr_matrix
+    dim = 2 ** n
+    rows = np.tile(np.arange(dim), n)
+    cols = np.concatenate([np.arange(dim) ^ (1 << (n - 1 - k)) for k in range(n)])
+    return csr_matrix((np.ones(n * dim), (rows, cols)), shape=(dim, dim))
+
+def simulate_adiabatic_fast(H_P, T=6.0, steps=100, schedule=None, method="trotter", tol=None):
+    """
+    Matrix-free adiabatic evolution under H(s) = (1 - s(u)) H_M + s(u) H_P,
+    u = t/T, with H_M the transverse-field mixer.
+      schedule : callable u -> s in [0, 1] (default linear s = u)
+      method   : "trotter" - second-order split-operator steps, diagonal phase
+                 for H_P and the mixer applied qubit by qubit
+                 "krylov"  - scipy expm_multiply on the sparse H(s) at the
+                 step midpoint
+      tol      : if given, step sizes are chosen by step doubling so the
+                 per-step state error stays below tol; steps is then only
+                 the initial guess
+    Returns times, optimal-subspace fidelities and the final state, like
+    simulate_continuous_adiabatic.
+    """
+    from qaoa_core import apply_x_mixer
+
+    cost_diag = as_cost_diagonal(H_P)
+    n = int(np.log2(cost_diag.shape[0]))
+    schedule = schedule or (lambda u: u)
+    psi = uniform_plus_state(n)
+
+    if method == "trotter":
+        # cut values take few distinct levels: exponentiate those, then gather
+        levels, level_idx = np.unique(cost_diag, return_inverse=True)
+
+        def step(psi, t, dt):
+            s = schedule((t + 0.5 * dt) / T)
+            half_phase = np.exp(-0.5j * s * dt * levels)[level_idx]
+            psi = psi * half_phase
+            apply_x_mixer(psi, (1.0 - s) * dt, n)
+            return psi * half_phase
+    elif method == "krylov":
+        from scipy.sparse import diags
+        from scipy.sparse.linalg import expm_multiply
+        H_M = _mixer_sparse(n)
+        H_C = diags(cost_diag)
+
+        def step(psi, t, dt):
+            s = schedule((t + 0.5 * dt) / T)
+            return expm_multiply(-1j * dt * ((1.0 - s) * H_M + s * H_C), psi)
+    else:
+        raise ValueError(f"Unknown adiabatic method: {method}")
+
+    times = [0.0]
+    fidelities = [optimal_subspace_fidelity(psi, cost_diag)]
+    t, dt = 0.0, T / steps
+
+    while t < T - 1e-12:
+        dt = min(dt, T - t)
+        if tol is None:
+            psi = step(psi, t, dt)
+        else:
+            coarse = step(psi, t, dt)
+            fine = step(step(psi, t, 0.5 * dt), t + 0.5 * dt, 0.5 * dt)
+            err = np.linalg.norm(fine - coarse)
+            if err > tol:
+                dt *= max(0.2, 0.9 * (tol / err) ** (1 / 3))
+                continue
+            psi = fine
+        t += dt
+        times.append(t)
+        fidelities.append(optimal_subspace_fidelity(psi, cost_diag))
+        if tol is not None:
+            # both schemes are locally third order in dt
+            dt *= min(2.0, 0.9 * (tol / max(err, 1e-16)) ** (1 / 3))
+
+    return np.array(times), np.array(fidelities), psi
+
 def tqa_params(p: int, T: float = 5.0):
     """
     Returns TQA (discretized adiabatic) parameters for depth p:
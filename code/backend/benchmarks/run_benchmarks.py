@@ -0,0 +1,169 @@
+"""
+Benchmark harness for the statevector backend.
+
+Sweeps qubit count, depth and graph family over the Hamiltonian builders,
+qaoa_state, the adiabatic simulators and run_optimization, recording wall
+time (best of --repeat), peak traced memory and nfev as JSON. With a
+baseline file, any case slower than baseline * (1 + threshold) is reported
+and the exit code is 1. CPU only, no network.
+
+    python code/backend/benchmarks/run_benchmarks.py --quick
+    python code/backend/benchmarks/run_benchmarks.py --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from graphs import GRAPH_FAMILIES
+from hamiltonian import build_cost_diagonal, build_problem_hamiltonian, build_mixer_hamiltonian
+from qaoa_core import qaoa_state
+from adiabatic import simulate_adiabatic_fast, simulate_continuous_adiabatic
+from fourier_heuristic import fourier_heuristic_params
+from optimizer_module import run_optimization
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+PRESETS = {
+    "quick": {"n": [3, 6, 10, 14], "p": [1, 3], "opt_n": [6], "opt_p": [1, 2],
+              "methods": ["COBYLA", "L-BFGS-B"]},
+    "full": {"n": [3, 6, 10, 14, 18, 20, 22, 24], "p": [1, 3, 5, 10], "opt_n": [6, 10, 14],
+             "opt_p": [1, 3, 5], "methods": ["COBYLA", "Nelder-Mead", "L-BFGS-B", "BFGS", "Bayesian"]},
+}
+DENSE_MAX_N = 10        # dense 2^n x 2^n builders
+DENSE_EXPM_MAX_N = 7    # per-step dense expm in simulate_continuous_adiabatic
+ADIABATIC_MAX_N = 18
+
+def measure(fn, repeat):
+    """Best wall time over `repeat` runs, peak traced memory of one run, and fn's result."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    out = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best, peak / 2**20, out
+
+def bound(func, *args, **kwargs):
+    """Callable running func on arguments bound now; returns None (no nfev)."""
+    def run():
+        func(*args, **kwargs)
+    return run
+
+def optimization_nfev(p, diag, method, init):
+    return int(run_optimization(p, diag, None, method=method, init=init)[2])
+
+def cases(preset, seed):
+    """
+    Yield (record, callable) pairs; callables return nfev or None. Each
+    callable binds its own arguments, so the pairs may be collected first
+    and run in any order.
+    """
+    for family, make in GRAPH_FAMILIES.items():
+        for n in preset["n"]:
+            if family == "3-regular" and n % 2:
+                continue
+            edges = make(n, seed=seed)
+            diag = build_cost_diagonal(n, edges)
+            base = {"family": family, "n": n}
+            yield {**base, "case": "build_cost_diagonal"}, bound(build_cost_diagonal, n, edges)
+            if n <= DENSE_MAX_N:
+                yield {**base, "case": "build_problem_hamiltonian"}, \
+                    bound(build_problem_hamiltonian, n, edges)
+            for p in preset["p"]:
+                params = fourier_heuristic_params(p)
+                yield {**base, "case": "qaoa_state", "p": p}, bound(qaoa_state, params, p, diag)
+            if n <= ADIABATIC_MAX_N:
+                yield {**base, "case": "simulate_adiabatic_fast", "steps": 100}, \
+                    bound(simulate_adiabatic_fast, diag, T=10.0, steps=100)
+            if n <= DENSE_EXPM_MAX_N:
+                H_M = build_mixer_hamiltonian(n)
+                yield {**base, "case": "simulate_continuous_adiabatic", "steps": 100}, \
+                    bound(simulate_continuous_adiabatic, diag, H_M, T=10.0, steps=100)
+            if n in preset["opt_n"]:
+                for p in preset["opt_p"]:
+                    for method in preset["methods"]:
+                        init = fourier_heuristic_params(p)
+                        yield {**base, "case": "run_optimization", "p": p, "method": method}, \
+                            partial(optimization_nfev, p, diag, method, init)
+
+def case_id(record):
+    return "|".join(f"{k}={record[k]}" for k in sorted(record)
+                    if k not in ("time_s", "peak_mb", "nfev"))
+
+def compare(results, baseline, threshold):
+    base = {case_id(r): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        ref = base.get(case_id(r))
+        if ref and r["time_s"] > ref["time_s"] * (1 + threshold) and r["time_s"] - ref["time_s"] > 1e-3:
+            regressions.append({"case": case_id(r), "time_s": r["time_s"],
+                                "baseline_s": ref["time_s"], "ratio": r["time_s"] / ref["time_s"]})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--quick", action="store_true", help="small sweep (default: full)")
+    parser.add_argument("--max-n", type=int, default=None, help="skip larger qubit counts")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown before a case counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results to --baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    preset = dict(PRESETS["quick" if args.quick else "full"])
+    if args.max_n is not None:
+        preset["n"] = [n for n in preset["n"] if n <= args.max_n]
+        preset["opt_n"] = [n for n in preset["opt_n"] if n <= args.max_n]
+
+    results = []
+    for record, fn in cases(preset, args.seed):
+        elapsed, peak_mb, out = measure(fn, args.repeat)
+        record.update(time_s=elapsed, peak_mb=peak_mb,
+                      nfev=out if isinstance(out, int) and not isinstance(out, bool) else None)
+        results.append(record)
+        print(f"{case_id(record):70s} {elapsed * 1e3:10.2f} ms {peak_mb:9.1f} MB"
+              + (f" nfev={record['nfev']}" if record["nfev"] is not None else ""))
+
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "processor": platform.processor(),
+                 "timestamp": time.time(), "preset": "quick" if args.quick else "full",
+                 "repeat": args.repeat, "seed": args.seed},
+        "results": results,
+    }
+    target = args.baseline if args.save_baseline else args.output
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {target}")
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    report["regressions"] = regressions
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for reg in regressions:
+        print(f"REGRESSION {reg['case']}: {reg['time_s']:.4f}s vs {reg['baseline_s']:.4f}s "
+              f"(x{reg['ratio']:.2f})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import os
+import numpy as np
+from hamiltonian import _edge_arrays, cost_diagonal_chunk
+from result_cache import graph_fingerprint
+from graphs import read_edge_list
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "QAOA_DIAGONAL_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../../output/cache/diagonals")),
+)
+
+def diagonal_path(n, edges, weights=None, store_dir=DEFAULT_STORE_DIR):
+    """File holding the cost diagonal of a graph, named by its fingerprint."""
+    return os.path.join(store_dir, f"{graph_fingerprint(n, edges, weights)}.f64")
+
+def build_diagonal_store(n, edges, weights=None, store_dir=DEFAULT_STORE_DIR,
+                         chunk_elems=1 << 22):
+    """
+    Write the MaxCut cost diagonal to a float64 memmap file, chunk by chunk,
+    so at most one chunk of 2^n is in RAM. An existing file for the same
+    graph is reused. The file is filled under a temporary name and renamed,
+    so concurrent builders never expose a partial diagonal. Returns the path.
+    """
+    path = diagonal_path(n, edges, weights, store_dir)
+    dim = 2**n
+    if os.path.exists(path) and os.path.getsize(path) == 8 * dim:
+        return path
+    edges, weights = _edge_arrays(edges, weights)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    diag = np.memmap(tmp, dtype=np.float64, mode="w+", shape=(dim,))
+    chunk = max(1, chunk_elems // max(1, len(edges)))
+    for start in range(0, dim, chunk):
+        stop = min(start + chunk, dim)
+        diag[start:stop] = cost_diagonal_chunk(n, edges, weights, start, stop) if len(edges) else 0.0
+    diag.flush()
+    del diag
+    os.replace(tmp, path)
+    return path
+
+def build_diagonal_store_from_file(edge_list_path, store_dir=DEFAULT_STORE_DIR,
+                                   chunk_elems=1 << 22):
+    """build_diagonal_store for an "i j [w]" edge-list file; returns (n, path)."""
+    n, edges, weights = read_edge_list(edge_list_path)
+    return n, build_diagonal_store(n, edges, weights, store_dir, chunk_elems)
+
+def open_diagonal(path):
+    """Read-only, zero-copy view of a stored diagonal (pages are shared between processes)."""
+    return np.memmap(path, dtype=np.float64, mode="r")
@@ -0,0 +1,158 @@
+"""
+Ensemble sweeps: optimize QAOA on many graph instances and append one JSON
+line per finished instance. Instances come from a random graph family or
+a directory of edge-list files; a rerun skips the ids already in the
+output file, so an interrupted sweep resumes where it stopped.
+
+    python code/backend/ensemble.py --family 3-regular --n 8 10 12 --count 200 --p 1 2 3
+    python code/backend/ensemble.py --edge-dir graphs/ --p 1 2 --out graphs.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from graphs import GRAPH_FAMILIES, read_edge_list
+from hamiltonian import build_cost_diagonal
+from qaoa_core import StateWorkspace
+from optimizer_module import run_depth_sweep
+
+def family_instances(family, n_values, count, seed=0):
+    """count instances of a graph family per n; ids are stable across runs."""
+    make = GRAPH_FAMILIES[family]
+    for n in n_values:
+        for k in range(count):
+            instance_seed = seed + k
+            yield {"id": f"{family}/n{n}/s{instance_seed}", "n": n,
+                   "edges": make(n, seed=instance_seed), "weights": None}
+
+def directory_instances(path):
+    """Every edge-list file in path (sorted), with the file name as id."""
+    for name in sorted(os.listdir(path)):
+        full = os.path.join(path, name)
+        if os.path.isfile(full) and not name.startswith("."):
+            n, edges, weights = read_edge_list(full)
+            yield {"id": name, "n": n, "edges": edges, "weights": weights}
+
+def completed_ids(out_path):
+    """
+    Ids already in a JSON-lines file. A line cut short by a crash is
+    dropped from the file so appending continues on a clean line.
+    """
+    if not os.path.exists(out_path):
+        return set()
+    with open(out_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        try:
+            done.add(json.loads(line)["id"])
+        except (ValueError, KeyError):
+            continue
+    return done
+
+# one StateWorkspace per (qubit count, dtype), kept by each worker process
+# and reloaded with every instance's diagonal instead of being reallocated
+_workspaces = {}
+
+def _run_instance(instance, p_values, method, dtype):
+    start = time.perf_counter()
+    n = instance["n"]
+    diag = build_cost_diagonal(n, instance["edges"], instance["weights"])
+    key = (n, np.dtype(dtype))
+    workspace = _workspaces.get(key)
+    if workspace is None:
+        workspace = _workspaces[key] = StateWorkspace(diag, dtype=dtype)
+    workspace.load(diag)
+    sweep = run_depth_sweep(diag, p_max=max(p_values), method=method, workspace=workspace)
+    c_max = float(diag.max())
+    by_p = {s["p"]: s for s in sweep}
+    return {
+        "id": instance["id"],
+        "n": n,
+        "n_edges": len(instance["edges"]),
+        "c_max": c_max,
+        "p": list(p_values),
+        "cost": [by_p[p]["cost"] for p in p_values],
+        "ratio": [by_p[p]["cost"] / c_max if c_max else 1.0 for p in p_values],
+        "nfev": [by_p[p]["nfev"] for p in p_values],
+        "params": [by_p[p]["params"].tolist() for p in p_values],
+        "time": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+def run_ensemble(instances, p_values, out_path, method="L-BFGS-B", max_workers=None,
+                 resume=True, dtype=np.complex128, progress=None):
+    """
+    Optimize every instance (depths 1..max(p_values) with INTERP warm starts)
+    in a process pool and append its record to out_path as soon as it is
+    done. At most two tasks per worker are in flight, so instances may be a
+    lazy generator of any length. With resume, ids already in out_path are
+    skipped. Returns the number of instances run.
+    """
+    p_values = sorted(p_values)
+    done = completed_ids(out_path) if resume else set()
+    if not resume and os.path.exists(out_path):
+        os.unlink(out_path)
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    todo = (inst for inst in instances if inst["id"] not in done)
+    n_run = 0
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool, \
+            open(out_path, "a", encoding="utf-8") as out:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < 2 * max_workers:
+                inst = next(todo, None)
+                if inst is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(_run_instance, inst, p_values, method, dtype))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                record = fut.result()
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                n_run += 1
+                if progress is not None:
+                    progress(record)
+    return n_run
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--family", choices=sorted(GRAPH_FAMILIES))
+    source.add_argument("--edge-dir", help="directory of 'i j [w]' edge-list files")
+    parser.add_argument("--n", type=int, nargs="+", default=[8], help="qubit counts (with --family)")
+    parser.add_argument("--count", type=int, default=10, help="instances per n (with --family)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--p", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--method", default="L-BFGS-B")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--single", action="store_true", help="complex64 statevectors")
+    parser.add_argument("--out", default="ensemble_results.jsonl")
+    parser.add_argument("--no-resume", action="store_true", help="start over instead of skipping done ids")
+    args = parser.parse_args(argv)
+
+    if args.family:
+        instances = family_instances(args.family, args.n, args.count, args.seed)
+    else:
+        instances = directory_instances(args.edge_dir)
+    report = lambda r: print(f"{r['id']}: ratio {', '.join(f'{x:.4f}' for x in r['ratio'])} "
+                             f"({r['time']:.2f}s)", flush=True)
+    n_run = run_ensemble(instances, args.p, args.out, method=args.method, max_workers=args.workers,
+                         resume=not args.no_resume,
+                         dtype=np.complex64 if args.single else np.complex128, progress=report)
+    print(f"{n_run} instances written to {args.out}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,3 +5,56 @@ def fourier_heuristic_params(p, base_amp=1.0):
     gammas = base_amp * np.sin(np.pi * k / (2 * p))
     betas = base_amp * np.cos(np.pi * k / (2 * p))
     return np.concatenate([gammas, betas])
+
+def interp_params(params):
+    """
+    INTERP warm start: linearly interpolate optimized depth-p angles onto
+    p+1 layers, [x]_i = (i-1)/p [x]_{i-1} + (p-i+1)/p [x]_i with x_0 = x_{p+1} = 0.
+    """
+    params = np.asarray(params, dtype=float)
+    p = len(params) // 2
+
+    def stretch(x):
+        padded = np.concatenate([[0.0], x, [0.0]])
+        i = np.arange(1, p + 2)
+        return (i - 1) / p * padded[i - 1] + (p - i + 1) / p * padded[i]
+
+    return np.concatenate([stretch(params[:p]), stretch(params[p:])])
+
+def _fourier_basis(q, p):
+    i = np.arange(1, p + 1)[:, None]
+    k = np.arange(1, q + 1)[None, :]
+    arg = (k - 0.5) * (i - 0.5) * np.pi / p
+    return np.sin(arg), np.cos(arg)
+
+def fourier_to_params(u, v, p):
+    """FOURIER parametrisation: γ_i = Σ_k u_k sin(...), β_i = Σ_k v_k cos(...)."""
+    sin_b, cos_b = _fourier_basis(len(u), p)
+    return np.concatenate([sin_b @ np.asarray(u), cos_b @ np.asarray(v)])
+
+def params_to_fourier(params, q=None):
+    """Least-squares (u, v) amplitudes with q modes reproducing the given angles."""
+    params = np.asarray(params, dtype=float)
+    p = len(params) // 2
+    sin_b, cos_b = _fourier_basis(q or p, p)
+    u = np.linalg.lstsq(sin_b, params[:p], rcond=None)[0]
+    v = np.linalg.lstsq(cos_b, params[p:], rcond=None)[0]
+    return u, v
+
+def fourier_warm_start(params, q=None):
+    """FOURIER[q] warm start: keep the optimized amplitudes, evaluate them at p+1."""
+    p = len(params) // 2
+    u, v = params_to_fourier(params, q)
+    return fourier_to_params(u, v, p + 1)
+
+def fourier_perturbed_starts(params, R, alpha=0.6, q=None, seed=None):
+    """
+    FOURIER[q, R]: R extra p+1 starts from the optimized amplitudes perturbed
+    by Gaussian noise of scale alpha * |amplitude|.
+    """
+    rng = np.random.default_rng(seed)
+    p = len(params) // 2
+    u, v = params_to_fourier(params, q)
+    return [fourier_to_params(u + alpha * rng.normal(0, np.abs(u)),
+                              v + alpha * rng.normal(0, np.abs(v)), p + 1)
+            for _ in range(R)]
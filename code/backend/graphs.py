@@ -0,0 +1,51 @@
+import numpy as np
+
+def ring_graph(n):
+    return [(i, (i + 1) % n) for i in range(n)] if n > 2 else [(0, 1)]
+
+def random_regular_graph(n, d=3, seed=None, max_tries=1000):
+    """Uniform-ish d-regular simple graph by rejection on the pairing model."""
+    if (n * d) % 2 or d >= n:
+        raise ValueError("need n * d even and d < n")
+    rng = np.random.default_rng(seed)
+    for _ in range(max_tries):
+        stubs = rng.permutation(np.repeat(np.arange(n), d)).reshape(-1, 2)
+        edges = {tuple(sorted(map(int, pair))) for pair in stubs}
+        if len(edges) == len(stubs) and all(i != j for i, j in edges):
+            return sorted(edges)
+    raise RuntimeError(f"no simple {d}-regular graph on {n} nodes after {max_tries} tries")
+
+def erdos_renyi_graph(n, prob=0.5, seed=None):
+    """G(n, prob); resampled until it has at least one edge."""
+    rng = np.random.default_rng(seed)
+    while True:
+        edges = [(i, j) for i in range(n) for j in range(i + 1, n) if rng.random() < prob]
+        if edges:
+            return edges
+
+GRAPH_FAMILIES = {
+    "ring": lambda n, seed=None: ring_graph(n),
+    "3-regular": lambda n, seed=None: random_regular_graph(n, 3, seed),
+    "erdos-renyi": lambda n, seed=None: erdos_renyi_graph(n, 0.5, seed),
+}
+
+def read_edge_list(path):
+    """
+    Whitespace-separated "i j [w]" lines ('#' comments allowed).
+    Returns (n, edges, weights) with weights None if no line has a third column.
+    """
+    edges, weights = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split("#", 1)[0].split()
+            if not parts:
+                continue
+            edges.append((int(parts[0]), int(parts[1])))
+            weights.append(float(parts[2]) if len(parts) > 2 else 1.0)
+    n = max(max(e) for e in edges) + 1 if edges else 0
+    return n, edges, (weights if any(w != 1.0 for w in weights) else None)
+
+def write_edge_list(path, edges, weights=None):
+    with open(path, "w", encoding="utf-8") as f:
+        for k, (i, j) in enumerate(edges):
+            f.write(f"{i} {j}\n" if weights is None else f"{i} {j} {weights[k]}\n")
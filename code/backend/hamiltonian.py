@@ -1,4 +1,5 @@
 import numpy as np
+from instrumentation import timed
 
 def build_operator_kron(n, op_map):
     I = np.eye(2)
@@ -11,16 +12,60 @@ def build_operator_kron(n, op_map):
         op = np.kron(op, ops[i])
     return op
 
+@timed()
 def build_problem_hamiltonian(n, edges):
-    dim = 2**n
-    I_full = np.eye(dim)
-    H_P = np.zeros((dim, dim))
-    for (i, j) in edges:
-        H_P += 0.5 * (I_full - build_operator_kron(n, {i: 'Z', j: 'Z'}))
-    return H_P
+    # H_P = sum 0.5 * (I - Z_i Z_j) is diagonal; build it from the cost vector
+    return np.diag(build_cost_diagonal(n, edges))
 
+@timed()
 def build_mixer_hamiltonian(n):
     H_M = np.zeros((2**n, 2**n))
     for i in range(n):
         H_M += build_operator_kron(n, {i: 'X'})
     return H_M
+
+def _edge_arrays(edges, weights=None):
+    edges = np.asarray(list(edges), dtype=np.int64).reshape(-1, 2)
+    if weights is None:
+        weights = np.ones(len(edges))
+    weights = np.asarray(weights, dtype=float)
+    if weights.shape != (len(edges),):
+        raise ValueError("weights must have one entry per edge")
+    return edges, weights
+
+def cost_diagonal_chunk(n, edges, weights, start, stop):
+    """
+    MaxCut cut values for basis indices [start, stop).
+    Qubit 0 is the most significant bit, matching build_operator_kron.
+    """
+    idx = np.arange(start, stop, dtype=np.int64)
+    shifts_i = (n - 1 - edges[:, 0])
+    shifts_j = (n - 1 - edges[:, 1])
+    cut = ((idx[:, None] >> shifts_i) ^ (idx[:, None] >> shifts_j)) & 1
+    return cut @ weights
+
+@timed()
+def build_cost_diagonal(n, edges, weights=None, chunk_elems=1 << 22):
+    """
+    Diagonal of build_problem_hamiltonian(n, edges) computed from bit operations
+    on the basis indices, without any 2^n x 2^n matrix.
+    Work is vectorized over edges in chunks of basis states so the temporary
+    (chunk, n_edges) block stays below chunk_elems entries.
+    """
+    edges, weights = _edge_arrays(edges, weights)
+    dim = 2**n
+    diag = np.zeros(dim)
+    if len(edges) == 0:
+        return diag
+    chunk = max(1, chunk_elems // len(edges))
+    for start in range(0, dim, chunk):
+        stop = min(start + chunk, dim)
+        diag[start:stop] = cost_diagonal_chunk(n, edges, weights, start, stop)
+    return diag
+
+def as_cost_diagonal(H_P):
+    """Accept either a dense diagonal Hamiltonian or its 1D cost vector."""
+    H_P = np.asarray(H_P)
+    if H_P.ndim == 1:
+        return H_P
+    return np.diag(H_P)
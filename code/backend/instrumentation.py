@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+import numpy as np
+
+# Switched on by default; QAOA_INSTRUMENT=0 (or set_enabled(False)) turns
+# every timer into a plain call.
+_enabled = os.environ.get("QAOA_INSTRUMENT", "1") not in ("0", "false", "no", "off")
+_lock = threading.Lock()
+_timers = {}      # name -> {"count", "total", "samples" (recent latencies)}
+_caches = {}      # name -> [hits, misses]
+_lru_caches = {}  # name -> (cache_info function, (hits, misses) already counted)
+SAMPLE_WINDOW = 2048
+QUANTILES = (0.5, 0.9, 0.99)
+
+def set_enabled(flag):
+    global _enabled
+    _enabled = bool(flag)
+
+def enabled():
+    return _enabled
+
+def observe(name, seconds, count=1):
+    """Record `count` calls of `name` taking `seconds` each (or in total for a batch)."""
+    if not _enabled:
+        return
+    with _lock:
+        t = _timers.get(name)
+        if t is None:
+            t = _timers[name] = {"count": 0, "total": 0.0, "samples": deque(maxlen=SAMPLE_WINDOW)}
+        t["count"] += count
+        t["total"] += seconds
+        t["samples"].append(seconds)
+
+def timed(name=None):
+    """Decorator recording call count and latency of a function."""
+    def decorate(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+@contextmanager
+def stage(name, into=None):
+    """
+    Time a block as "stage.<name>". The elapsed seconds are also stored in
+    the dict `into` (if given) even when instrumentation is off, which is
+    how compute_results builds its per-stage timings.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if into is not None:
+            into[name] = into.get(name, 0.0) + elapsed
+        observe(f"stage.{name}", elapsed)
+
+def record_cache(name, hit):
+    if not _enabled:
+        return
+    with _lock:
+        c = _caches.setdefault(name, [0, 0])
+        c[0 if hit else 1] += 1
+
+def register_cache(name, cache_info):
+    """Report a functools.lru_cache (pass its cache_info) under `name`."""
+    with _lock:
+        _lru_caches[name] = (cache_info, (0, 0))
+
+def _collect_lru():
+    # fold lru_cache counters into _caches as deltas, so drain/merge across
+    # processes counts every hit once
+    with _lock:
+        for name, (info, (hits, misses)) in list(_lru_caches.items()):
+            now = info()
+            c = _caches.setdefault(name, [0, 0])
+            c[0] += now.hits - hits
+            c[1] += now.misses - misses
+            _lru_caches[name] = (info, (now.hits, now.misses))
+
+def drain():
+    """Return the raw counters recorded so far and reset them (used by pool workers)."""
+    global _timers, _caches
+    _collect_lru()
+    with _lock:
+        timers, caches = _timers, _caches
+        _timers, _caches = {}, {}
+    return {
+        "timers": {k: {"count": t["count"], "total": t["total"], "samples": list(t["samples"])}
+                   for k, t in timers.items()},
+        "caches": caches,
+    }
+
+def merge(raw):
+    """Add counters returned by drain() in another process."""
+    if not raw or not _enabled:
+        return
+    with _lock:
+        for name, src in raw["timers"].items():
+            t = _timers.get(name)
+            if t is None:
+                t = _timers[name] = {"count": 0, "total": 0.0, "samples": deque(maxlen=SAMPLE_WINDOW)}
+            t["count"] += src["count"]
+            t["total"] += src["total"]
+            t["samples"].extend(src["samples"])
+        for name, (hits, misses) in raw["caches"].items():
+            c = _caches.setdefault(name, [0, 0])
+            c[0] += hits
+            c[1] += misses
+
+def reset():
+    global _timers, _caches
+    _collect_lru()
+    with _lock:
+        _timers, _caches = {}, {}
+
+def _after_fork():
+    # a forked worker starts with a copy of the parent's counters; drop them
+    # (and the lock, which another thread may have held at fork time) so
+    # drain() only returns what the worker itself recorded
+    global _lock, _timers, _caches
+    _lock = threading.Lock()
+    _timers, _caches = {}, {}
+    for name, (info, _) in list(_lru_caches.items()):
+        now = info()
+        _lru_caches[name] = (info, (now.hits, now.misses))
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+def snapshot():
+    """Summary per timer (count, total, mean, percentiles) and per cache (hits, misses, hit_rate)."""
+    _collect_lru()
+    with _lock:
+        timers = {k: (t["count"], t["total"], np.array(t["samples"])) for k, t in _timers.items()}
+        caches = {k: tuple(c) for k, c in _caches.items()}
+    out = {"timers": {}, "caches": {}}
+    for name, (count, total, samples) in sorted(timers.items()):
+        entry = {"count": count, "total": total, "mean": total / count if count else 0.0}
+        for q in QUANTILES:
+            entry[f"p{int(q * 100)}"] = float(np.quantile(samples, q)) if samples.size else 0.0
+        out["timers"][name] = entry
+    for name, (hits, misses) in sorted(caches.items()):
+        total = hits + misses
+        out["caches"][name] = {"hits": hits, "misses": misses,
+                               "hit_rate": hits / total if total else 0.0}
+    return out
+
+def prometheus_text(prefix="qaoa"):
+    """The snapshot in Prometheus text exposition format."""
+    snap = snapshot()
+    lines = [
+        f"# HELP {prefix}_latency_seconds Latency of instrumented calls and stages.",
+        f"# TYPE {prefix}_latency_seconds summary",
+    ]
+    for name, t in snap["timers"].items():
+        for q in QUANTILES:
+            lines.append(f'{prefix}_latency_seconds{{name="{name}",quantile="{q}"}} '
+                         f'{t["p" + str(int(q * 100))]:.9g}')
+        lines.append(f'{prefix}_latency_seconds_sum{{name="{name}"}} {t["total"]:.9g}')
+        lines.append(f'{prefix}_latency_seconds_count{{name="{name}"}} {t["count"]}')
+    for metric, field, kind, help_text in (
+        ("cache_hits_total", "hits", "counter", "Cache hits."),
+        ("cache_misses_total", "misses", "counter", "Cache misses."),
+        ("cache_hit_ratio", "hit_rate", "gauge", "Cache hit rate."),
+    ):
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, c in snap["caches"].items():
+            lines.append(f'{prefix}_{metric}{{cache="{name}"}} {c[field]:.9g}')
+    return "\n".join(lines) + "\n"
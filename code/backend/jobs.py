@@ -0,0 +1,252 @@
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+class JobCancelled(Exception):
+    """Raised by a job runner when its cancel event is set."""
+
+class QueueFull(RuntimeError):
+    """Raised when too many jobs are already waiting."""
+
+def check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled()
+
+class JobManager:
+    """
+    Runs submitted jobs through a bounded worker pool. Each job gets its own
+    output directory under `root` and a cancel event that the runner checks
+    between stages. At most max_queued jobs may wait for a worker.
+    Finished jobs are forgotten once they are older than max_age seconds or
+    more than max_finished of them are kept; directories the manager created
+    under root are deleted with them and on_evict(job_id, out_dir) is called.
+    With a ProgressBoard, jobs that end cancelled or failed without saying so
+    themselves (e.g. cancelled while queued) get that status published.
+      runner(spec, out_dir, cancel_event) -> result dict
+    """
+
+    def __init__(self, runner, root, max_workers=2, max_queued=16, max_finished=100, max_age=3600.0,
+                 board=None, on_evict=None):
+        self.runner = runner
+        self.board = board
+        self.on_evict = on_evict
+        self.root = root
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.max_age = max_age
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qaoa-job")
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, spec, job_id=None, out_dir=None):
+        job_id = job_id or uuid.uuid4().hex
+        with self.lock:
+            if self.is_active(job_id):
+                raise ValueError(f"job {job_id} is already active")
+            queued = sum(1 for j in self.jobs.values() if j["state"] == "queued")
+            if queued >= self.max_queued:
+                raise QueueFull("job queue is full")
+            job = {
+                "id": job_id,
+                "state": "queued",
+                "spec": spec,
+                "out_dir": out_dir or os.path.join(self.root, job_id),
+                "owns_dir": out_dir is None,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "result": None,
+                "error": None,
+                "cancel": threading.Event(),
+            }
+            self.jobs[job_id] = job
+            job["future"] = self.pool.submit(self._run, job)
+        self.evict()
+        return job_id
+
+    def _run(self, job):
+        with self.lock:
+            cancelled = job["cancel"].is_set()
+            if cancelled:
+                job["state"], job["finished"] = "cancelled", time.time()
+            else:
+                job["state"], job["started"] = "running", time.time()
+        if cancelled:
+            self._report_end(job)
+            return
+        try:
+            os.makedirs(job["out_dir"], exist_ok=True)
+            result = self.runner(job["spec"], job["out_dir"], job["cancel"])
+            state = "error" if result.get("status") == "error" else "done"
+            job.update(result=result, error=result.get("message"))
+        except JobCancelled:
+            state = "cancelled"
+        except Exception as e:
+            traceback.print_exc()
+            state = "error"
+            job["error"] = str(e)
+        with self.lock:
+            job["state"], job["finished"] = state, time.time()
+        self._report_end(job)
+        self.evict()
+
+    def _report_end(self, job):
+        if self.board is not None and job["state"] in ("cancelled", "error"):
+            fields = {"status": job["state"]}
+            if job["error"]:
+                fields["message"] = job["error"]
+            self.board.finish(os.path.abspath(job["out_dir"]), **fields)
+
+    def evict(self, now=None):
+        """Forget finished jobs beyond max_age / max_finished and delete their own directories."""
+        now = time.time() if now is None else now
+        with self.lock:
+            finished = sorted((j for j in self.jobs.values() if j["finished"] is not None
+                               and j["state"] not in ("queued", "running")),
+                              key=lambda j: j["finished"])
+            n_over = len(finished) - self.max_finished
+            evicted = [j for k, j in enumerate(finished)
+                       if k < n_over or now - j["finished"] > self.max_age]
+            for job in evicted:
+                del self.jobs[job["id"]]
+        for job in evicted:
+            if job["owns_dir"]:
+                shutil.rmtree(job["out_dir"], ignore_errors=True)
+            if self.on_evict is not None:
+                self.on_evict(job["id"], job["out_dir"])
+        return [job["id"] for job in evicted]
+
+    def get(self, job_id):
+        """JSON-friendly snapshot of a job, or None."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {k: job[k] for k in ("id", "state", "spec", "submitted", "started",
+                                        "finished", "result", "error")}
+
+    def output_dir(self, job_id):
+        job = self.jobs.get(job_id)
+        return None if job is None else job["out_dir"]
+
+    def is_active(self, job_id):
+        job = self.jobs.get(job_id)
+        return job is not None and job["state"] in ("queued", "running")
+
+    def cancel(self, job_id):
+        """Request cancellation; queued jobs never start, running ones stop at the next stage."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["state"] not in ("queued", "running"):
+                return False
+            job["cancel"].set()
+            cancelled = job["future"].cancel()
+            if cancelled:
+                job["state"], job["finished"] = "cancelled", time.time()
+        if cancelled:
+            self._report_end(job)
+        return True
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job is no longer queued or running; False on timeout."""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            wait([job["future"]], timeout=timeout)
+        return not self.is_active(job_id)
+
+    def shutdown(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+        self.pool.shutdown(wait=True)
+
+class ProgressBoard:
+    """
+    Partial results of running jobs, kept in memory per key (the job's
+    output directory) so status readers never touch disk. Every update
+    makes a new snapshot with a new ETag; the JSON body is serialized once
+    per update and shared by all readers. wait() blocks until the ETag
+    changes, which serves long-polling and Server-Sent Events alike.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.boards = {}  # key -> (etag, data, body)
+
+    def start(self, key, data=None):
+        """Begin a new run under key (superseding any earlier one); returns its Progress handle."""
+        return Progress(self, key, uuid.uuid4().hex[:12], dict(data or {}))
+
+    def _publish(self, key, generation, version, data):
+        body = json.dumps(data)
+        with self.cond:
+            current = self.boards.get(key)
+            if version and (current is None or current[0].split("-")[0] != generation):
+                return False  # a newer run owns this key
+            self.boards[key] = (f"{generation}-{version}", data, body)
+            self.cond.notify_all()
+            return True
+
+    def seed(self, key, load):
+        """Publish load() under key unless the key already has a snapshot; returns get(key)."""
+        with self.cond:
+            if key not in self.boards:
+                data = load()
+                self.boards[key] = (f"{uuid.uuid4().hex[:12]}-0", data, json.dumps(data))
+                self.cond.notify_all()
+            return self.boards[key]
+
+    def finish(self, key, **fields):
+        """Merge a final status (cancelled / error) into key's snapshot unless it already has one."""
+        with self.cond:
+            etag, data, _ = self.boards.get(key, (None, {}, None))
+            if data.get("status") in ("done", "error", "cancelled"):
+                return
+            data = {**data, **fields}
+            generation = etag.split("-")[0] if etag else uuid.uuid4().hex[:12]
+            # suffix keeps this ETag distinct from any version of the run's Progress
+            self.boards[key] = (f"{generation}-end", data, json.dumps(data))
+            self.cond.notify_all()
+
+    def drop(self, key):
+        """Forget key's snapshot (its job was evicted); waiting readers are woken."""
+        with self.cond:
+            if self.boards.pop(key, None) is not None:
+                self.cond.notify_all()
+
+    def get(self, key):
+        """(etag, data, body) of the latest snapshot, or (None, None, None)."""
+        with self.cond:
+            return self.boards.get(key, (None, None, None))
+
+    def wait(self, key, etag=None, timeout=15.0):
+        """Like get, but first wait up to timeout for a snapshot whose ETag is not etag."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.boards.get(key, (etag,))[0] != etag, timeout=timeout)
+            return self.boards.get(key, (None, None, None))
+
+class Progress:
+    """Publishing handle of one run; updates are dropped once a newer run has started."""
+
+    def __init__(self, board, key, generation, data):
+        self.board, self.key, self.generation = board, key, generation
+        self.version = 0
+        self.data = data
+        self.lock = threading.Lock()
+        board._publish(key, generation, 0, data)
+
+    def update(self, **fields):
+        with self.lock:
+            self.data = {**self.data, **fields}
+            self.version += 1
+            self.board._publish(self.key, self.generation, self.version, self.data)
+
+    def append(self, field, value):
+        with self.lock:
+            self.data = {**self.data, field: list(self.data.get(field, [])) + [value]}
+            self.version += 1
+            self.board._publish(self.key, self.generation, self.version, self.data)
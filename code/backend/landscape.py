@@ -0,0 +1,165 @@
+import itertools
+from fractions import Fraction
+from functools import reduce
+from math import gcd
+import numpy as np
+from hamiltonian import as_cost_diagonal
+from qaoa_core import qaoa_expectation_batch, _has_closed_form
+
+def gamma_period(H_P, max_denominator=1000, tol=1e-9):
+    """
+    Period of <C> in each gamma: exp(-i gamma C) repeats up to a global phase
+    after 2 pi / g, with g the largest number dividing every gap between cost
+    levels (g = 1 for unweighted MaxCut, 2 when all cuts are even). Returns
+    None if the levels are not commensurate (e.g. irrational weights).
+    """
+    levels = np.unique(np.round(as_cost_diagonal(H_P), 12))
+    fracs = []
+    for d in levels[1:] - levels[0]:
+        f = Fraction(float(d)).limit_denominator(max_denominator)
+        if abs(float(f) - d) > tol * max(1.0, abs(d)):
+            return None
+        fracs.append(f)
+    if not fracs:
+        return 2 * np.pi
+    denom = reduce(lambda a, b: a * b // gcd(a, b), (f.denominator for f in fracs))
+    g = reduce(gcd, (int(f * denom) for f in fracs)) / denom
+    return 2 * np.pi / g
+
+def _local_extrema(Z, maxima_only=False, periodic=False):
+    padded = np.pad(Z, 1, mode="wrap" if periodic else "edge")
+    neigh = np.stack([padded[1 + di:1 + di + Z.shape[0], 1 + dj:1 + dj + Z.shape[1]]
+                      for di, dj in itertools.product((-1, 0, 1), repeat=2) if di or dj])
+    is_max = (Z >= neigh).all(axis=0)
+    return is_max if maxima_only else is_max | (Z <= neigh).all(axis=0)
+
+def _refine(u, v, Z, evaluate, fraction):
+    """
+    Double the grid. New points are predicted by a cubic spline and evaluated
+    exactly only inside active cells: the steepest `fraction` of cells (by
+    corner spread) plus every cell touching a local extremum.
+    """
+    from scipy.interpolate import RectBivariateSpline
+
+    u2 = np.linspace(u[0], u[-1], 2 * len(u) - 1)
+    v2 = np.linspace(v[0], v[-1], 2 * len(v) - 1)
+    spline = RectBivariateSpline(u, v, Z, kx=min(3, len(u) - 1), ky=min(3, len(v) - 1))
+    Z2 = spline(u2, v2)
+    Z2[::2, ::2] = Z
+
+    corners = np.stack([Z[:-1, :-1], Z[1:, :-1], Z[:-1, 1:], Z[1:, 1:]])
+    spread = corners.max(axis=0) - corners.min(axis=0)
+    active = spread >= np.quantile(spread, 1 - fraction)
+    ext = _local_extrema(Z)
+    active |= ext[:-1, :-1] | ext[1:, :-1] | ext[:-1, 1:] | ext[1:, 1:]
+
+    mask = np.zeros(Z2.shape, dtype=bool)
+    ii, jj = np.nonzero(active)
+    for di, dj in itertools.product(range(3), repeat=2):
+        mask[2 * ii + di, 2 * jj + dj] = True
+    mask[::2, ::2] = False
+    U, V = np.meshgrid(u2, v2, indexing="ij")
+    if mask.any():
+        Z2[mask] = evaluate(U[mask], V[mask])
+    return u2, v2, Z2, int(mask.sum())
+
+def scan_landscape(H_P, p=1, H_M=None, axes=None, base=None, resolution=200, coarse=17,
+                   refine_fraction=0.25, ranges=None, n_optima=5):
+    """
+    <C> on a resolution x resolution grid over two parameters (axes, default
+    (gamma_1, beta_1); the other entries of the 2p vector are taken from
+    base, so p >= 2 gives slices). H_P may be a cost diagonal, the dense
+    Hamiltonian or a closed-form evaluator (lightcone.LightConeMaxCut).
+
+    Without explicit ranges the grid covers one period per axis: gamma in
+    [0, gamma_period), beta in [0, pi/2) (X^n commutes with C). For p=1,
+    time reversal <C>(gamma, beta) = <C>(-gamma, -beta) halves that again.
+    Only the reduced domain is simulated: a coarse grid is refined by grid
+    doubling near extrema and steep regions, and the rest is spline
+    interpolated, so a 200 x 200 map costs a few thousand evaluations.
+
+    Returns a dict with the axis coordinates x/y, values (resolution x
+    resolution), the ranges, n_evals and the best local maxima as full
+    parameter vectors ("optima", ready to use as optimizer init) with
+    their exact energies ("optima_values").
+    """
+    from scipy.interpolate import RectBivariateSpline
+
+    closed_form = _has_closed_form(H_P)
+    diag = None if closed_form else as_cost_diagonal(H_P)
+    axes = (0, p) if axes is None else tuple(axes)
+    base = np.zeros(2 * p) if base is None else np.asarray(base, dtype=float)
+    period = H_P.gamma_period if closed_form else gamma_period(diag)
+    time_reversal = periodic = False
+    if ranges is None:
+        ranges = [(0.0, (period or np.pi) if a < p else np.pi / 2) for a in axes]
+        periodic = period is not None or all(a >= p for a in axes)
+        time_reversal = p == 1 and period is not None
+    (x_lo, x_hi), (y_lo, y_hi) = ranges
+    x_red = (x_lo + x_hi) / 2 if time_reversal else x_hi
+    n_evals = 0
+
+    def evaluate(xs, ys):
+        params = np.tile(base, (len(xs), 1))
+        params[:, axes[0]] = xs
+        params[:, axes[1]] = ys
+        if closed_form:
+            return H_P.expectation_batch(params, p)
+        return qaoa_expectation_batch(params, p, diag, H_M)
+
+    u = np.linspace(x_lo, x_red, coarse)
+    v = np.linspace(y_lo, y_hi, coarse)
+    U, V = np.meshgrid(u, v, indexing="ij")
+    Z = evaluate(U.ravel(), V.ravel()).reshape(U.shape)
+    n_evals += Z.size
+    while 2 * (len(u) - 1) <= resolution:
+        u, v, Z, n_new = _refine(u, v, Z, evaluate, refine_fraction)
+        n_evals += n_new
+
+    spline = RectBivariateSpline(u, v, Z)
+    x = np.linspace(x_lo, x_hi, resolution)
+    y = np.linspace(y_lo, y_hi, resolution)
+    X, Y = np.meshgrid(x, y, indexing="ij")
+    if time_reversal:
+        mirror = X > x_red
+        X[mirror] = x_lo + x_hi - X[mirror]
+        Y[mirror] = y_lo + y_hi - Y[mirror]
+    values = spline.ev(X, Y)
+
+    # local maxima of the full map (wrapping around when it spans whole
+    # periods; the last row/column repeats the first), best first, a few
+    # cells apart and inside the reduced domain, then evaluated exactly
+    if periodic:
+        ii, jj = np.nonzero(_local_extrema(values[:-1, :-1], maxima_only=True, periodic=True))
+    else:
+        ii, jj = np.nonzero(_local_extrema(values, maxima_only=True))
+    keep = x[ii] <= x_red
+    ii, jj = ii[keep], jj[keep]
+    order = np.argsort(-values[ii, jj])
+    min_sep = 2 * max(u[1] - u[0], v[1] - v[0])
+    picks = []
+    for k in order:
+        point = (x[ii[k]], y[jj[k]])
+        if all(np.hypot(point[0] - a, point[1] - b) > min_sep for a, b in picks):
+            picks.append(point)
+        if len(picks) == n_optima:
+            break
+    optima = np.tile(base, (len(picks), 1))
+    if picks:
+        optima[:, axes[0]], optima[:, axes[1]] = np.array(picks).T
+    optima_values = evaluate(optima[:, axes[0]], optima[:, axes[1]]) if picks else np.empty(0)
+    n_evals += len(picks)
+    best = np.argsort(-optima_values)
+
+    return {
+        "axes": axes,
+        "x": x,
+        "y": y,
+        "values": values,
+        "ranges": [tuple(ranges[0]), tuple(ranges[1])],
+        "gamma_period": period,
+        "time_reversal": time_reversal,
+        "n_evals": n_evals,
+        "optima": optima[best],
+        "optima_values": optima_values[best],
+    }
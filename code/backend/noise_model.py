@@ -1,8 +1,10 @@
-from qiskit_aer.noise import NoiseModel, depolarizing_error
-from qiskit import QuantumCircuit
 import numpy as np
+from hamiltonian import as_cost_diagonal
+from qaoa_core import apply_x_mixer
 
 def get_noise_model(prob=0.02):
+    # qiskit is only needed for the Aer noise model, not the NumPy simulators below
+    from qiskit_aer.noise import NoiseModel, depolarizing_error
     model = NoiseModel()
     dep_err = depolarizing_error(prob, 1)
     for gate in ['u1', 'u2', 'u3']:
@@ -11,3 +13,116 @@ def get_noise_model(prob=0.02):
 
 def apply_noise_to_state(psi, prob=0.02):
     return (1 - prob) * psi + prob * np.random.normal(0, 0.05, psi.shape)
+
+# ---------- Quantum trajectories ----------
+def _qubit_view(psi, q, n):
+    return psi.reshape(psi.shape[:-1] + (2**q, 2, 2**(n - q - 1)))
+
+def _trajectory_channels(psi, n, p_dep, gamma, rng):
+    """
+    One round of single-qubit depolarizing (prob p_dep) and amplitude
+    damping (rate gamma) on every qubit, sampled independently per row of
+    the (rows, 2^n) batch. p_dep and gamma hold one value per row.
+    """
+    rows = psi.shape[0]
+    for q in range(n):
+        view = _qubit_view(psi, q, n)
+        # depolarizing: X, Y, Z each with probability p_dep / 3
+        r = rng.random(rows)
+        hit_x = r < p_dep / 3
+        hit_y = (r >= p_dep / 3) & (r < 2 * p_dep / 3)
+        hit_z = (r >= 2 * p_dep / 3) & (r < p_dep)
+        view[hit_x] = view[hit_x][:, :, ::-1, :]
+        y_rows = view[hit_y]
+        view[hit_y] = np.stack([-1j * y_rows[:, :, 1, :], 1j * y_rows[:, :, 0, :]], axis=2)
+        view[hit_z, :, 1, :] *= -1
+
+        # amplitude damping: jump |1> -> |0> with probability gamma * P(q = 1)
+        if np.any(gamma > 0):
+            p_one = np.sum(np.abs(view[:, :, 1, :]) ** 2, axis=(1, 2))
+            jump = rng.random(rows) < gamma * p_one
+            view[jump, :, 0, :] = view[jump, :, 1, :]
+            view[jump, :, 1, :] = 0
+            stay = ~jump
+            view[stay, :, 1, :] *= np.sqrt(1 - gamma[stay])[:, None, None]
+            psi /= np.linalg.norm(psi, axis=1, keepdims=True)
+    return psi
+
+def _noisy_trajectories(params, p, cost_diag, p_dep, gamma, rng, max_bytes=1 << 28):
+    """Mean <C> per row for rows carrying their own noise strengths."""
+    dim = cost_diag.shape[0]
+    n = int(np.log2(dim))
+    rows = len(p_dep)
+    chunk = max(1, max_bytes // (3 * 16 * dim))
+    values = np.empty(rows)
+    for start in range(0, rows, chunk):
+        sl = slice(start, min(start + chunk, rows))
+        psi = np.full((sl.stop - sl.start, dim), 1 / np.sqrt(dim), dtype=complex)
+        for k in range(p):
+            psi *= np.exp(-1j * params[k] * cost_diag)
+            apply_x_mixer(psi, np.full(len(psi), params[p + k]), n)
+            _trajectory_channels(psi, n, p_dep[sl], gamma[sl], rng)
+        values[sl] = (np.abs(psi) ** 2) @ cost_diag
+    return values
+
+# ---------- Exact density matrix ----------
+_PAULIS = {
+    "X": np.array([[0, 1], [1, 0]], dtype=complex),
+    "Y": np.array([[0, -1j], [1j, 0]]),
+    "Z": np.array([[1, 0], [0, -1]], dtype=complex),
+}
+
+def _apply_kraus(rho, kraus, q, n):
+    L, R = 2**q, 2**(n - q - 1)
+    rho_t = rho.reshape(L, 2, R, L, 2, R)
+    out = sum(np.einsum("ab,xbyzcw,dc->xayzdw", K, rho_t, K.conj()) for K in kraus)
+    return out.reshape(rho.shape)
+
+def _density_matrix_expectation(params, p, cost_diag, p_dep, gamma):
+    dim = cost_diag.shape[0]
+    n = int(np.log2(dim))
+    rho = np.full((dim, dim), 1 / dim, dtype=complex)
+    dep = [np.sqrt(1 - p_dep) * np.eye(2)] + [np.sqrt(p_dep / 3) * P for P in _PAULIS.values()]
+    damp = [np.array([[1, 0], [0, np.sqrt(1 - gamma)]]), np.array([[0, np.sqrt(gamma)], [0, 0]])]
+    for k in range(p):
+        phase = np.exp(-1j * params[k] * cost_diag)
+        rho *= phase[:, None] * phase.conj()[None, :]
+        # M rho M^dagger: M^dagger = exp(+i beta sum X) on the rows, then M on the columns
+        rho = apply_x_mixer(rho, np.full(dim, -params[p + k]), n)
+        rho = apply_x_mixer(np.ascontiguousarray(rho.T), np.full(dim, params[p + k]), n).T
+        for q in range(n):
+            rho = _apply_kraus(rho, dep, q, n)
+            rho = _apply_kraus(rho, damp, q, n)
+    return float(np.real(np.dot(np.diag(rho), cost_diag)))
+
+def noisy_qaoa_expectation(params, p, H_P, depolarizing=0.0, damping=0.0,
+                           trajectories=256, seed=None, exact=False):
+    """
+    <C> of the QAOA circuit with single-qubit depolarizing and amplitude
+    damping channels applied to every qubit after each layer.
+    By default this is a Monte-Carlo average over a batch of quantum
+    trajectories propagated together; exact=True evolves the full density
+    matrix instead (small n only, for checking).
+    """
+    cost_diag = as_cost_diagonal(H_P)
+    params = np.asarray(params, dtype=float)
+    if exact:
+        return _density_matrix_expectation(params, p, cost_diag, depolarizing, damping)
+    rng = np.random.default_rng(seed)
+    p_dep = np.full(trajectories, float(depolarizing))
+    gamma = np.full(trajectories, float(damping))
+    return float(np.mean(_noisy_trajectories(params, p, cost_diag, p_dep, gamma, rng)))
+
+def noise_sweep(params, p, H_P, levels, channel="depolarizing", trajectories=256, seed=None):
+    """
+    Noisy <C> for each noise level. All levels x trajectories are run as one
+    batch, so the whole grid costs about one batched evolution.
+    """
+    cost_diag = as_cost_diagonal(H_P)
+    levels = np.asarray(levels, dtype=float)
+    per_row = np.repeat(levels, trajectories)
+    zeros = np.zeros_like(per_row)
+    p_dep, gamma = (per_row, zeros) if channel == "depolarizing" else (zeros, per_row)
+    rng = np.random.default_rng(seed)
+    values = _noisy_trajectories(np.asarray(params, dtype=float), p, cost_diag, p_dep, gamma, rng)
+    return values.reshape(len(levels), trajectories).mean(axis=1)
@@ -1,56 +1,236 @@
+import warnings
 import numpy as np
-from scipy.optimize import minimize
-from skopt import gp_minimize
-from skopt.space import Real
-from skopt.utils import use_named_args
-from qaoa_core import qaoa_expectation
-from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
-
-def run_bayesian_opt(objective, p):
+from qaoa_core import (qaoa_state, qaoa_expectation, qaoa_expectation_and_gradient,
+                       qaoa_expectation_batch, StateWorkspace, _is_subspace_mixer,
+                       _has_closed_form)
+from sampling import BitstringSampler, counts_statistics
+from instrumentation import timed
+
+# scipy.optimize, skopt and sklearn are imported inside the functions that use
+# them, so importing this module (e.g. in pool workers) stays cheap
+
+# Settings of each method. They are part of the result-cache key, so changing
+# one here invalidates the runs cached with the old value.
+METHOD_OPTIONS = {
+    "Nelder-Mead": {"maxiter": 100, "fatol": 1e-4},
+    "COBYLA": {"maxiter": 100, "tol": 1e-4},
+    "L-BFGS-B": {"maxiter": 100, "gtol": 1e-6},
+    "BFGS": {"maxiter": 100, "gtol": 1e-6},
+    "Bayesian": {"n_calls": 25, "n_initial_points": 10, "batch_size": 5, "refit_every": 2, "seed": 42},
+}
+
+def _gp(kernel, refit):
+    from skopt.learning import GaussianProcessRegressor
+
+    # optimizer=None keeps the kernel hyperparameters fixed, so fitting is a
+    # single Cholesky factorization instead of a marginal-likelihood search
+    return GaussianProcessRegressor(kernel=kernel, alpha=1e-6, normalize_y=True,
+                                    optimizer="fmin_l_bfgs_b" if refit else None,
+                                    n_restarts_optimizer=2 if refit else 0)
+
+def run_bayesian_opt(objective, p, batch_objective=None, n_calls=25, n_initial_points=10,
+                     batch_size=5, kernel=None, refit_every=2, x0=None, y0=None,
+                     history=None, seed=42):
     """
-    Runs Bayesian optimization using Gaussian Process surrogate with a broad kernel range.
+    Batch Bayesian optimization with a Gaussian process surrogate (kernel,
+    default C * RBF) and expected improvement. Each round proposes batch_size
+    points by the constant-liar heuristic (cl_min) and evaluates them with one
+    batch_objective call if given. Kernel hyperparameters are refitted every
+    refit_every rounds; rounds in between reuse the learned kernel.
+    x0/y0 are extra starting points (x0 without y0 is evaluated in the first
+    batch) and history, a list, supplies earlier (x, y) observations and
+    collects the new ones. n_calls counts new evaluations only.
     """
+    from skopt import Optimizer
+    from skopt.space import Real, Space
+    from skopt.utils import normalize_dimensions
+
+    if kernel is None:
+        from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+        kernel = C(1.0, (1e-3, 1e3)) * RBF(length_scale=1.0, length_scale_bounds=(1e-2, 1e5))
+    evaluate = batch_objective or (lambda X: [objective(np.asarray(x)) for x in X])
     bounds = [Real(0.0, np.pi, name=f"param_{i}") for i in range(2 * p)]
+    rng = np.random.RandomState(seed)  # shared by the per-round optimizers
 
-    @use_named_args(bounds)
-    def objective_wrapper(**params):
-        x = np.array(list(params.values()))
-        return objective(x)
+    def record(X, y):
+        X = [[float(v) for v in x] for x in X]
+        y = [float(v) for v in y]
+        if history is not None:
+            history.extend(zip(X, y))
+        return X, y
 
-    
-    kernel = C(1.0, (1e-3, 1e3)) * RBF(length_scale=1.0, length_scale_bounds=(1e-2, 1e5))
+    all_X, all_y = [], []
+    if history:
+        all_X += [list(x) for x, _ in history if len(x) == 2 * p]
+        all_y += [y for x, y in history if len(x) == 2 * p]
+    if x0 is not None and y0 is not None:
+        all_X, all_y = all_X + [list(x) for x in x0], all_y + list(y0)
 
-    res = gp_minimize(
-        func=objective_wrapper,
-        dimensions=bounds,
-        acq_func="EI",
-        n_calls=25,
-        random_state=42,
-        n_initial_points=10,
-        noise=1e-6,
-        base_estimator=None
-    )
-    return np.array(res.x), -res.fun, len(res.func_vals)
+    # initial design: x0 without values plus uniform random points, one batch
+    design = [] if x0 is None or y0 is not None else [list(np.clip(x, 0.0, np.pi)) for x in x0]
+    # the surrogate needs at least one observation before its first round
+    n_random = max(0, min(max(n_initial_points, 0 if all_X else 1), n_calls) - len(design))
+    design += np.random.default_rng(seed).uniform(0.0, np.pi, (n_random, 2 * p)).tolist()
+    design = design[:n_calls]
+    X, y = record(design, evaluate(np.array(design)) if design else [])
+    all_X, all_y = all_X + X, all_y + y
+    n_done = len(X)
 
+    # hyperparameters are fitted on the evaluated points only; each round's
+    # Optimizer then holds that kernel fixed, so telling it the data and the
+    # constant-liar refits inside ask() are plain Cholesky factorizations
+    space = Space(normalize_dimensions(bounds))  # the Optimizer's GP space
+    rounds = 0
+    while n_done < n_calls:
+        q = min(batch_size, n_calls - n_done)
+        if rounds % refit_every == 0:
+            gp = _gp(kernel, refit=True)
+            with warnings.catch_warnings():
+                # convergence warnings, silenced as Optimizer.tell does
+                warnings.simplefilter("ignore")
+                gp.fit(space.transform(all_X), all_y)
+            kernel = gp.kernel_
+        opt = Optimizer(bounds, base_estimator=_gp(kernel, refit=False),
+                        acq_func="EI", acq_optimizer="sampling", n_initial_points=0,
+                        random_state=rng)
+        opt.tell(all_X, all_y)
+        batch = opt.ask(n_points=q, strategy="cl_min")
+        X, y = record(batch, evaluate(np.array(batch)))
+        all_X, all_y = all_X + X, all_y + y
+        n_done += len(X)
+        rounds += 1
+
+    best = int(np.argmin(all_y))
+    return np.array(all_X[best]), -all_y[best], n_done
+
+def _sampled_objective(p, H_P, H_M, dense_mixer, objective, shots, alpha, seed):
+    """Finite-shot mean or CVaR objective; one seeded RNG per optimization run."""
+    rng = np.random.default_rng(seed)
+    key = {"sampled": "mean", "cvar": "cvar"}[objective]
+
+    def sampled(params):
+        psi = qaoa_state(params, p, H_P, H_M, dense_mixer=dense_mixer)
+        counts = BitstringSampler(psi, rng).counts(shots)
+        return -counts_statistics(counts, H_P, alpha)[key]
+    return sampled
+
+@timed()
+def run_optimization(p, H_P, H_M, method="COBYLA", init=None, dense_mixer=False,
+                     objective="expectation", shots=1024, alpha=0.1, seed=None, dtype=np.complex128,
+                     history=None, workspace=None):
+    """
+    objective="expectation" optimizes the exact <C>; "sampled" and "cvar"
+    optimize the finite-shot mean / CVaR_alpha from `shots` samples per
+    evaluation (seeded by `seed`), and the returned cost is that estimate.
+    With the transverse-field mixer the exact objective runs on one
+    StateWorkspace for the whole optimization; dtype=np.complex64 selects
+    its single-precision mode. For "Bayesian", init is part of the first
+    batch and history (a list of (x, -value) pairs) warm-starts the
+    surrogate and receives the new observations, so repeated runs on one
+    problem build on each other. H_P may also be a closed-form evaluator
+    such as lightcone.LightConeMaxCut (p=1, exact objective only).
+    A StateWorkspace already loaded with H_P can be passed in to reuse its
+    buffers across runs.
+    """
+    from scipy.optimize import minimize
 
-def run_optimization(p, H_P, H_M, method="COBYLA", init=None):
+    bayes_init = init
     if init is None:
         init = np.random.uniform(0, np.pi, 2 * p)
 
-    objective = lambda params: -qaoa_expectation(params, p, H_P, H_M)
+    closed_form = _has_closed_form(H_P)
+    if closed_form:
+        # same expectation / expectation_and_gradient interface as a workspace
+        workspace = H_P
+    elif dense_mixer or _is_subspace_mixer(H_M):
+        workspace = None
+    elif workspace is None:
+        workspace = StateWorkspace(H_P, dtype=dtype)
+
+    if objective == "expectation":
+        if workspace is not None:
+            objective = lambda params: -workspace.expectation(params, p)
+        else:
+            objective = lambda params: -qaoa_expectation(params, p, H_P, H_M, dense_mixer=dense_mixer)
+        sampled = False
+    elif objective in ("sampled", "cvar"):
+        if closed_form:
+            raise ValueError("sampled objectives need a statevector, not a closed-form H_P")
+        objective = _sampled_objective(p, H_P, H_M, dense_mixer, objective, shots, alpha, seed)
+        sampled = True
+    else:
+        raise ValueError(f"Unknown objective: {objective}")
 
     if method == "Nelder-Mead":
         res = minimize(objective, init, method=method,
-                       options={"maxiter": 100, "fatol": 1e-4})
+                       options=METHOD_OPTIONS[method])
         return res.x, -res.fun, res.nfev
 
     elif method == "COBYLA":
         res = minimize(objective, init, method=method,
-                       options={"maxiter": 100, "tol": 1e-4})
+                       options=METHOD_OPTIONS[method])
+        return res.x, -res.fun, res.nfev
+
+    elif method in ("L-BFGS-B", "BFGS"):
+        if sampled:
+            raise ValueError(f"{method} needs the exact expectation objective")
+        # adjoint gradient: one forward + one backward sweep per evaluation
+        def value_and_grad(params):
+            if workspace is not None:
+                value, grad = workspace.expectation_and_gradient(params, p)
+            else:
+                value, grad = qaoa_expectation_and_gradient(params, p, H_P, H_M,
+                                                            dense_mixer=dense_mixer)
+            return -value, -grad
+        res = minimize(value_and_grad, init, method=method, jac=True,
+                       options=METHOD_OPTIONS[method])
         return res.x, -res.fun, res.nfev
 
     elif method == "Bayesian":
-        return run_bayesian_opt(objective, p)
+        x0 = None if bayes_init is None else [bayes_init]
+        if dense_mixer or sampled:
+            return run_bayesian_opt(objective, p, x0=x0, history=history,
+                                    **METHOD_OPTIONS[method])
+        if closed_form:
+            batch_objective = lambda X: -H_P.expectation_batch(X, p)
+        else:
+            batch_objective = lambda X: -qaoa_expectation_batch(X, p, H_P, H_M)
+        return run_bayesian_opt(objective, p, batch_objective=batch_objective,
+                                x0=x0, history=history, **METHOD_OPTIONS[method])
 
     else:
         raise ValueError(f"Unknown optimization method: {method}")
+
+
+@timed()
+def run_depth_sweep(H_P, H_M=None, p_max=5, method="L-BFGS-B", strategy="interp",
+                    n_perturb=0, init=None, seed=None, dense_mixer=False, workspace=None):
+    """
+    Optimize p = 1..p_max, starting each depth from the previous optimum:
+      strategy="interp"  - INTERP interpolation of the p-1 angles
+      strategy="fourier" - FOURIER[q, R] warm start plus n_perturb perturbed starts
+    Returns one dict per depth with params, cost, nfev (summed over starts).
+    """
+    from fourier_heuristic import (fourier_heuristic_params, interp_params,
+                                   fourier_warm_start, fourier_perturbed_starts)
+
+    sweep = []
+    starts = [fourier_heuristic_params(1) if init is None else np.asarray(init)]
+    for p in range(1, p_max + 1):
+        best, nfev = None, 0
+        for x0 in starts:
+            params, cost, evals = run_optimization(p, H_P, H_M, method=method, init=x0,
+                                                   dense_mixer=dense_mixer, workspace=workspace)
+            nfev += evals
+            if best is None or cost > best[1]:
+                best = (np.asarray(params), cost)
+        sweep.append({"p": p, "params": best[0], "cost": float(best[1]), "nfev": int(nfev)})
+
+        if strategy == "interp":
+            starts = [interp_params(best[0])]
+        elif strategy == "fourier":
+            starts = [fourier_warm_start(best[0])]
+            starts += fourier_perturbed_starts(best[0], n_perturb, seed=seed)
+        else:
+            raise ValueError(f"Unknown warm-start strategy: {strategy}")
+    return sweep
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import instrumentation
+
+PLOT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../output/cache/plots"))
+
+# result["plots"] key -> (visualization_module function, image file)
+PLOTS = {
+    "energy_landscape": ("plot_energy_landscape", "energy_landscape.png"),
+    "correlation_heatmap": ("plot_correlation_heatmap", "correlation_heatmap.png"),
+    "noise_sensitivity": ("plot_noise_vs_ratio", "noise_sensitivity.png"),
+    "adiabatic_fidelity": ("plot_adiabatic_fidelity", "adiabatic_fidelity.png"),
+    "qaoa_vs_tqa": ("plot_qaoa_vs_tqa", "qaoa_vs_tqa.png"),
+    "params_schedule": ("plot_param_schedules", "params_schedule.png"),
+}
+
+def _digest(h, obj):
+    if isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            h.update(repr(k).encode())
+            _digest(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"[{len(obj)}".encode())
+        for v in obj:
+            _digest(h, v)
+    else:
+        h.update(repr(obj).encode())
+
+def plot_key(name, kwargs):
+    """Content hash of a plot and all of its input data."""
+    h = hashlib.sha256(name.encode())
+    _digest(h, kwargs)
+    return h.hexdigest()
+
+def _atomic_copy(src, dst):
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def render_plot(name, kwargs, out_dir, cache_dir=PLOT_CACHE_DIR, max_cached=500):
+    """
+    Render one plot into out_dir, reusing the cached image for identical
+    input data. Images are drawn in a scratch directory and moved into
+    place, so readers never see a half-written file. Returns the path.
+    """
+    func_name, filename = PLOTS[name]
+    target = os.path.join(out_dir, filename)
+    os.makedirs(out_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    cached = os.path.join(cache_dir, plot_key(name, kwargs) + ".png")
+    hit = os.path.exists(cached)
+    instrumentation.record_cache("plot_cache", hit)
+    if hit:
+        os.utime(cached)
+        _atomic_copy(cached, target)
+        return target
+
+    import visualization_module
+    scratch = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        getattr(visualization_module, func_name)(**kwargs, out_dir=scratch)
+        _atomic_copy(os.path.join(scratch, filename), cached)
+        _atomic_copy(cached, target)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    images = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir) if f.endswith(".png")]
+    if len(images) > max_cached:
+        images.sort(key=os.path.getmtime)
+        for path in images[:len(images) - max_cached]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    return target
+
+def _render_job(name, kwargs, out_dir, cache_dir):
+    # pool task: the worker's timings travel back with the result
+    render_plot(name, kwargs, out_dir, cache_dir)
+    return instrumentation.drain()
+
+def _merge_metrics(future):
+    if not future.cancelled() and future.exception() is None:
+        instrumentation.merge(future.result())
+
+class PlotRenderer:
+    """
+    Renders figures in a process pool so numeric results can be returned
+    before the plots exist. Plots are remembered by output path until their
+    image is in place; ensure(path) briefly waits for a pending render, or
+    renders on demand if a known image is missing (e.g. the pool render failed).
+    """
+
+    def __init__(self, max_workers=2, cache_dir=PLOT_CACHE_DIR):
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.pool = None
+        self.pending = {}
+        self.specs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, name, kwargs, out_dir, on_ready=None):
+        """Queue one plot; on_ready(name) is called once its image is in place."""
+        path = os.path.abspath(os.path.join(out_dir, PLOTS[name][1]))
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            spec = self.specs[path] = (name, kwargs, out_dir)
+            future = self.pool.submit(_render_job, name, kwargs, out_dir, self.cache_dir)
+            future.add_done_callback(_merge_metrics)
+            future.add_done_callback(lambda f: self._done(path, spec, f))
+            if on_ready is not None:
+                # failed renders are reported too: ensure() redraws them on request
+                future.add_done_callback(lambda f: f.cancelled() or on_ready(name))
+            self.pending[path] = future
+        return path
+
+    def _done(self, path, spec, future):
+        # keep the spec only while the image is missing, so ensure() can redraw it
+        with self.lock:
+            if self.pending.get(path) is future:
+                del self.pending[path]
+            if self.specs.get(path) is spec and os.path.exists(path):
+                del self.specs[path]
+
+    def submit_all(self, plots, out_dir, on_ready=None):
+        """plots: {name: kwargs}; returns {name: image file name}."""
+        for name, kwargs in plots.items():
+            self.submit(name, kwargs, out_dir, on_ready)
+        return {name: PLOTS[name][1] for name in plots}
+
+    def ensure(self, path, timeout=5.0):
+        """
+        Wait up to timeout for a pending render of path, or draw a known but
+        missing image now; returns whether the image exists.
+        """
+        path = os.path.abspath(path)
+        with self.lock:
+            future = self.pending.get(path)
+            spec = self.specs.get(path)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except TimeoutError:
+                return False
+            except Exception:
+                future = None
+        if future is None and spec is not None and not os.path.exists(path):
+            render_plot(*spec, cache_dir=self.cache_dir)
+            with self.lock:
+                if self.specs.get(path) is spec:
+                    del self.specs[path]
+        return os.path.exists(path)
+
+    def rendering(self, path):
+        """Whether a pool render of path is still queued or running."""
+        with self.lock:
+            future = self.pending.get(os.path.abspath(path))
+        return future is not None and not future.done()
+
+    def forget(self, out_dir):
+        """Drop pending renders for a directory that is being wiped."""
+        out_dir = os.path.abspath(out_dir)
+        with self.lock:
+            for path in [p for p in self.specs if os.path.dirname(p) == out_dir]:
+                future = self.pending.pop(path, None)
+                if future is not None:
+                    future.cancel()
+                self.specs.pop(path, None)
@@ -0,0 +1,113 @@
+import mmap
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from result_cache import cached_optimization
+from fourier_heuristic import fourier_heuristic_params
+from hamiltonian import as_cost_diagonal
+from diagonal_store import open_diagonal
+import instrumentation
+
+# Problem data installed once per worker process by the pool initializer,
+# so individual jobs only carry (p, method, init).
+_worker_problem = {}
+
+def _init_worker(H_P, H_M, dense_mixer, cache, problem_key):
+    if isinstance(H_P, str):
+        H_P = open_diagonal(H_P)
+    _worker_problem.update(H_P=H_P, H_M=H_M, dense_mixer=dense_mixer,
+                           cache=cache, problem_key=problem_key)
+
+def _run_job(job):
+    start = time.perf_counter()
+    params, cost, nfev, cached = cached_optimization(
+        _worker_problem["cache"], _worker_problem["problem_key"],
+        job["p"], _worker_problem["H_P"], _worker_problem["H_M"],
+        method=job["method"], init=job["init"],
+        dense_mixer=_worker_problem["dense_mixer"],
+    )
+    return {
+        **job,
+        "params": np.asarray(params),
+        "cost": float(cost),
+        "nfev": int(nfev),
+        "cached": cached,
+        "time": time.perf_counter() - start,
+        "pid": os.getpid(),
+        "metrics": instrumentation.drain(),
+    }
+
+class OptimizerPortfolio:
+    """
+    Process pool running (method x start) optimization jobs on one problem.
+    H_P (cost diagonal or dense) and H_M are sent to each worker once at
+    start-up instead of with every task. With a ResultCache and a
+    problem_key (e.g. graph_fingerprint) finished runs are reused.
+    A diagonal from diagonal_store (its memmap or file path) is passed to
+    the workers by path and mapped read-only, so they share one copy.
+    """
+
+    def __init__(self, H_P, H_M=None, dense_mixer=False, max_workers=None,
+                 cache=None, problem_key=None):
+        if isinstance(H_P, (str, os.PathLike)):
+            H_P = open_diagonal(os.fspath(H_P))
+        # only a whole mapped file (not a view into one) can be reopened by path
+        if isinstance(H_P, np.memmap) and isinstance(H_P.base, mmap.mmap) and H_P.offset == 0:
+            shared = H_P.filename
+        elif not dense_mixer:
+            shared = H_P = as_cost_diagonal(H_P)
+        else:
+            shared = H_P
+        self.c_max = float(np.max(as_cost_diagonal(H_P)))
+        self.pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                        initargs=(shared, H_M, dense_mixer, cache, problem_key))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def jobs(self, p, methods, n_random=0, heuristic=True, seed=None, init=None):
+        rng = np.random.default_rng(seed)
+        starts = [("init", np.asarray(init))] if init is not None else []
+        if heuristic:
+            starts.append(("fourier", fourier_heuristic_params(p)))
+        starts += [(f"random-{i}", rng.uniform(0, np.pi, 2 * p)) for i in range(n_random)]
+        return [{"p": p, "method": m, "start": name, "init": init}
+                for name, init in starts for m in methods]
+
+    def iter_results(self, p, methods=("COBYLA", "Nelder-Mead", "Bayesian"), n_random=0,
+                     heuristic=True, seed=None, init=None, target_ratio=None):
+        """
+        Yield job results as they finish. Once a job reaches target_ratio the
+        jobs still queued are cancelled (running ones finish but are dropped).
+        """
+        futures = [self.pool.submit(_run_job, job)
+                   for job in self.jobs(p, methods, n_random, heuristic, seed, init)]
+        try:
+            for fut in as_completed(futures):
+                if fut.cancelled():
+                    continue
+                res = fut.result()
+                instrumentation.merge(res.pop("metrics"))
+                res["ratio"] = res["cost"] / self.c_max
+                yield res
+                if target_ratio is not None and res["ratio"] >= target_ratio:
+                    break
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+    def run(self, p, **kwargs):
+        return list(self.iter_results(p, **kwargs))
+
+def run_portfolio(H_P, p, H_M=None, dense_mixer=False, max_workers=None,
+                  cache=None, problem_key=None, **kwargs):
+    """One-shot portfolio run; returns the job results in completion order."""
+    with OptimizerPortfolio(H_P, H_M, dense_mixer, max_workers, cache, problem_key) as portfolio:
+        return portfolio.run(p, **kwargs)
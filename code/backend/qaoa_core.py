@@ -1,27 +1,263 @@
 import numpy as np
-from scipy.linalg import expm
 from functools import lru_cache
+from hamiltonian import as_cost_diagonal
+from instrumentation import timed, register_cache
 
-@lru_cache(maxsize=None)
+@lru_cache(maxsize=256)
 def _cached_exp(H_key, angle, dim):
+    # scipy is only needed on this dense reference path
+    from scipy.linalg import expm
+
     H = np.array(H_key, dtype=np.complex128).reshape((dim, dim))
     return expm(-1j * angle * H)
 
-def qaoa_state(params, p, H_P, H_M):
+register_cache("expm", _cached_exp.cache_info)
+
+def apply_x_mixer(psi, beta, n):
+    """
+    Apply exp(-i beta sum_k X_k) = prod_k (cos(beta) I - i sin(beta) X_k) in place.
+    The state is viewed as (left, 2, right) for each qubit k, so no matrix is
+    formed and each layer costs O(n 2^n). psi may carry leading batch axes,
+    in which case beta holds one angle per batch entry.
+    """
+    lead = psi.shape[:-1]
+    beta = np.reshape(beta, lead + (1, 1, 1))
+    c, s = np.cos(beta), -1j * np.sin(beta)
+    for k in range(n):
+        view = psi.reshape(lead + (2**k, 2, 2**(n - k - 1)))
+        # reversing the qubit axis applies X_k
+        flipped = view[..., ::-1, :] * s
+        view *= c
+        view += flipped
+    return psi
+
+def apply_x_sum(psi, n):
+    """Return (sum_k X_k) psi, the generator of apply_x_mixer."""
+    out = np.zeros_like(psi)
+    for k in range(n):
+        src = psi.reshape(2**k, 2, 2**(n - k - 1))
+        dst = out.reshape(2**k, 2, 2**(n - k - 1))
+        dst[:, 0, :] += src[:, 1, :]
+        dst[:, 1, :] += src[:, 0, :]
+    return out
+
+def _is_subspace_mixer(H_M):
+    return hasattr(H_M, "apply_generator")
+
+def _has_closed_form(H_P):
+    # e.g. lightcone.LightConeMaxCut, which evaluates <C> without a statevector
+    return hasattr(H_P, "expectation_batch")
+
+@timed()
+def qaoa_state(params, p, H_P, H_M=None, dense_mixer=False):
+    """
+    H_P may be the dense problem Hamiltonian or its cost diagonal.
+    The transverse-field mixer is applied qubit by qubit; pass dense_mixer=True
+    to use the dense expm of H_M instead (reference path). H_M may also be a
+    symmetry-reduced mixer from symmetry_module (anything with initial_state,
+    apply and apply_generator), with H_P its reduced cost diagonal.
+    """
     gammas = params[:p]
     betas = params[p:]
-    dim = H_P.shape[0]
-    psi = (1 / np.sqrt(dim)) * np.ones(dim, dtype=complex)
-    diag_HP = np.diag(H_P)
+    diag_HP = as_cost_diagonal(H_P)
+    dim = diag_HP.shape[0]
+    n = int(np.log2(dim))
+    subspace = _is_subspace_mixer(H_M)
+    if subspace:
+        psi = H_M.initial_state()
+    else:
+        psi = (1 / np.sqrt(dim)) * np.ones(dim, dtype=complex)
 
     for k in range(p):
         # diagonal exponential = vectorized element-wise multiply
         psi *= np.exp(-1j * gammas[k] * diag_HP)
-        U_M = _cached_exp(tuple(H_M.flatten()), betas[k], H_M.shape[0])
-        psi = U_M @ psi
+        if dense_mixer:
+            U_M = _cached_exp(tuple(H_M.flatten()), betas[k], H_M.shape[0])
+            psi = U_M @ psi
+        elif subspace:
+            psi = H_M.apply(psi, betas[k])
+        else:
+            apply_x_mixer(psi, betas[k], n)
 
     return psi
 
-def qaoa_expectation(params, p, H_P, H_M):
-    psi = qaoa_state(params, p, H_P, H_M)
-    return np.real(np.vdot(psi, H_P @ psi))
\ No newline at end of file
+@timed()
+def qaoa_expectation(params, p, H_P, H_M=None, dense_mixer=False):
+    psi = qaoa_state(params, p, H_P, H_M, dense_mixer=dense_mixer)
+    # H_P is diagonal, so <psi|H_P|psi> = sum_x C(x) |psi_x|^2
+    return float(np.dot(as_cost_diagonal(H_P), np.abs(psi) ** 2))
+
+@timed()
+def qaoa_expectation_and_gradient(params, p, H_P, H_M=None, dense_mixer=False):
+    """
+    <C> and its gradient w.r.t. all 2p angles by the adjoint method:
+    one forward sweep to the final state, then one backward sweep that
+    un-applies each layer to both the state and lam = U^dagger C psi.
+    Returns (expectation, grad) with grad ordered like params.
+    """
+    gammas = params[:p]
+    betas = params[p:]
+    diag_HP = as_cost_diagonal(H_P)
+    n = int(np.log2(diag_HP.shape[0]))
+    psi = qaoa_state(params, p, diag_HP, H_M, dense_mixer=dense_mixer)
+    lam = diag_HP * psi
+    energy = float(np.real(np.vdot(psi, lam)))
+    grad = np.zeros(2 * p)
+
+    for k in reversed(range(p)):
+        if dense_mixer:
+            grad[p + k] = 2 * np.real(np.vdot(lam, -1j * (H_M @ psi)))
+            U_inv = _cached_exp(tuple(H_M.flatten()), -betas[k], H_M.shape[0])
+            psi = U_inv @ psi
+            lam = U_inv @ lam
+        elif _is_subspace_mixer(H_M):
+            grad[p + k] = 2 * np.real(np.vdot(lam, -1j * H_M.apply_generator(psi)))
+            psi = H_M.apply(psi, -betas[k])
+            lam = H_M.apply(lam, -betas[k])
+        else:
+            grad[p + k] = 2 * np.real(np.vdot(lam, -1j * apply_x_sum(psi, n)))
+            apply_x_mixer(psi, -betas[k], n)
+            apply_x_mixer(lam, -betas[k], n)
+        grad[k] = 2 * np.real(np.vdot(lam, -1j * diag_HP * psi))
+        phase_inv = np.exp(1j * gammas[k] * diag_HP)
+        psi *= phase_inv
+        lam *= phase_inv
+
+    return energy, grad
+
+@timed()
+def qaoa_expectation_batch(params_batch, p, H_P, H_M=None, dense_mixer=False, max_bytes=1 << 28):
+    """
+    <C> for every row of a (B, 2p) parameter array. Rows are evolved together
+    as a (chunk, 2^n) block of statevectors, with chunk chosen so the block
+    and its phase temporary stay under max_bytes.
+    """
+    params_batch = np.atleast_2d(np.asarray(params_batch, dtype=float))
+    diag_HP = as_cost_diagonal(H_P)
+    if dense_mixer or _is_subspace_mixer(H_M):
+        return np.array([qaoa_expectation(x, p, diag_HP, H_M, dense_mixer=dense_mixer)
+                         for x in params_batch])
+    dim = diag_HP.shape[0]
+    n = int(np.log2(dim))
+    chunk = max(1, max_bytes // (3 * 16 * dim))
+    values = np.empty(len(params_batch))
+
+    for start in range(0, len(params_batch), chunk):
+        block = params_batch[start:start + chunk]
+        psi = np.full((len(block), dim), 1 / np.sqrt(dim), dtype=complex)
+        for k in range(p):
+            psi *= np.exp(-1j * block[:, k, None] * diag_HP)
+            apply_x_mixer(psi, block[:, p + k], n)
+        values[start:start + chunk] = (np.abs(psi) ** 2) @ diag_HP
+
+    return values
+
+class StateWorkspace:
+    """
+    Preallocated buffers for repeated QAOA evaluations on one cost diagonal
+    with the transverse-field mixer, as in an optimizer loop. Phases, mixer
+    layers and |psi|^2 are computed in place, so a call allocates nothing
+    of size 2^n. dtype=np.complex64 halves the state memory (energies agree
+    with complex128 to about 1e-5 relative).
+    """
+
+    def __init__(self, H_P, dtype=np.complex128):
+        self.dtype = np.dtype(dtype)
+        real = np.float32 if self.dtype == np.complex64 else np.float64
+        self.diag = np.asarray(as_cost_diagonal(H_P), dtype=real)
+        self.dim = self.diag.shape[0]
+        self.n = int(np.log2(self.dim))
+        self.psi = np.empty(self.dim, dtype=self.dtype)
+        self.buf = np.empty(self.dim, dtype=self.dtype)  # phase / mixer scratch
+        self.real = np.empty(self.dim, dtype=real)
+        self.lam = None
+        self.gen = None
+
+    def load(self, H_P):
+        """Switch to another cost diagonal of the same size, keeping the buffers."""
+        diag = np.asarray(as_cost_diagonal(H_P), dtype=self.diag.dtype)
+        if diag.shape != self.diag.shape:
+            raise ValueError(f"workspace holds 2^{self.n} amplitudes, got a diagonal of {diag.shape[0]}")
+        self.diag = diag
+        return self
+
+    def _phase(self, vecs, gamma):
+        # buf = exp(-i gamma C), then vec *= buf for every vec
+        np.multiply(self.diag, -gamma, out=self.real)
+        np.cos(self.real, out=self.buf.real)
+        np.sin(self.real, out=self.buf.imag)
+        for vec in vecs:
+            vec *= self.buf
+
+    def _mix(self, vec, beta):
+        # apply_x_mixer with buf as the flipped-half temporary
+        c, s = np.cos(beta), -1j * np.sin(beta)
+        for k in range(self.n):
+            shape = (2**k, 2, 2**(self.n - k - 1))
+            view = vec.reshape(shape)
+            flipped = self.buf.reshape(shape)
+            np.multiply(view[:, ::-1, :], s, out=flipped)
+            view *= c
+            view += flipped
+
+    def _x_sum(self, vec, out):
+        out.fill(0)
+        for k in range(self.n):
+            shape = (2**k, 2, 2**(self.n - k - 1))
+            src, dst = vec.reshape(shape), out.reshape(shape)
+            dst[:, 0, :] += src[:, 1, :]
+            dst[:, 1, :] += src[:, 0, :]
+
+    def state(self, params, p):
+        """Final state in the workspace buffer (overwritten by the next call)."""
+        self.psi.fill(1 / np.sqrt(self.dim))
+        for k in range(p):
+            self._phase((self.psi,), params[k])
+            self._mix(self.psi, params[p + k])
+        return self.psi
+
+    @timed("workspace.expectation")
+    def expectation(self, params, p):
+        psi = self.state(params, p)
+        np.abs(psi, out=self.real)
+        self.real *= self.real
+        return float(np.dot(self.real, self.diag))
+
+    @timed("workspace.expectation_and_gradient")
+    def expectation_and_gradient(self, params, p):
+        """Same adjoint sweep as qaoa_expectation_and_gradient, in place."""
+        if self.lam is None:
+            self.lam = np.empty_like(self.psi)
+            self.gen = np.empty_like(self.psi)
+        psi, lam, gen = self.state(params, p), self.lam, self.gen
+        np.multiply(psi, self.diag, out=lam)
+        energy = float(np.real(np.vdot(psi, lam)))
+        grad = np.zeros(2 * p)
+
+        # Re <lam| -i G |psi> = Im <lam| G |psi>
+        for k in reversed(range(p)):
+            self._x_sum(psi, gen)
+            grad[p + k] = 2 * np.imag(np.vdot(lam, gen))
+            self._mix(psi, -params[p + k])
+            self._mix(lam, -params[p + k])
+            np.multiply(psi, self.diag, out=gen)
+            grad[k] = 2 * np.imag(np.vdot(lam, gen))
+            self._phase((psi, lam), -params[k])
+
+        return energy, grad
+
+def zz_correlations(psi, chunk=1 << 16):
+    """
+    Matrix M_ij = <Z_i Z_j> of a statevector, computed as S^T diag(|psi|^2) S
+    with S the +/-1 spin table, in chunks of basis states.
+    """
+    prob = np.abs(psi) ** 2
+    dim = prob.shape[0]
+    n = int(np.log2(dim))
+    shifts = n - 1 - np.arange(n)
+    M = np.zeros((n, n))
+    for start in range(0, dim, chunk):
+        idx = np.arange(start, min(start + chunk, dim))
+        spins = 1.0 - 2.0 * ((idx[:, None] >> shifts) & 1)
+        M += (spins * prob[start:start + chunk, None]).T @ spins
+    return M
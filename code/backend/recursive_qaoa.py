@@ -1,20 +1,67 @@
 from optimizer_module import run_optimization
-from hamiltonian import build_problem_hamiltonian, build_mixer_hamiltonian
+from hamiltonian import build_cost_diagonal
+from fourier_heuristic import fourier_heuristic_params
+from qaoa_core import qaoa_state, zz_correlations
 import numpy as np
 
-def recursive_qaoa(n, edges, p=3, corr_threshold=0.9):
-    fixed = {}
+def eliminate_qubit(cost_diag, a, b, sign):
+    """
+    Cost diagonal after imposing Z_b = sign * Z_a (a < b) and dropping qubit b.
+    It is read off the current diagonal by index arithmetic, so no Hamiltonian
+    is rebuilt: y indexes the m-1 remaining qubits, x the matching old state.
+    """
+    m = int(np.log2(cost_diag.shape[0]))
+    y = np.arange(2 ** (m - 1), dtype=np.int64)
+    low_bits = m - 1 - b
+    high = y >> low_bits
+    low = y & ((1 << low_bits) - 1)
+    bit_a = (y >> (m - 2 - a)) & 1
+    bit_b = bit_a ^ (1 if sign < 0 else 0)
+    x = (high << (low_bits + 1)) | (bit_b << low_bits) | low
+    return cost_diag[x]
+
+def recursive_qaoa(n, edges, p=3, n_cutoff=4, weights=None, method="L-BFGS-B"):
+    """
+    Recursive QAOA for MaxCut. Each round optimizes QAOA on the current
+    cost diagonal (warm-started from the previous round's angles), measures
+    all <Z_i Z_j> of the optimized state, fixes the most strongly correlated
+    pair Z_b = sign(M_ab) Z_a and contracts qubit b away. Once at most
+    n_cutoff qubits remain the rest is solved by brute force.
+    Returns a dict with the assignment (one bit per node), its cut value,
+    the fixed relations {(a, b): sign} and the first round's correlations.
+    """
+    cost_diag = build_cost_diagonal(n, edges, weights)
     remaining = list(range(n))
-    while len(remaining) > 2:
-        H_P = build_problem_hamiltonian(len(remaining), [(i, j) for i, j in edges if i in remaining and j in remaining])
-        H_M = build_mixer_hamiltonian(len(remaining))
-        params, cost, _ = run_optimization(p, H_P, H_M)
-        psi = np.abs(np.real(np.conjugate(np.random.rand(2**len(remaining))).T))
-        corr = np.corrcoef(psi[:2], psi[2:4])[0, 1]
-        if np.abs(corr) > corr_threshold:
-            fixed_pair = (remaining[0], remaining[1])
-            fixed[fixed_pair] = np.sign(corr)
-            remaining.remove(fixed_pair[1])
-        else:
-            break
-    return fixed
+    fixed = []
+    correlations = {}
+    params = fourier_heuristic_params(p)
+
+    while len(remaining) > n_cutoff:
+        params, _, _ = run_optimization(p, cost_diag, None, method=method, init=params)
+        M = zz_correlations(qaoa_state(params, p, cost_diag))
+        if not correlations:
+            correlations = {(remaining[i], remaining[j]): float(M[i, j])
+                            for i in range(len(remaining)) for j in range(i + 1, len(remaining))}
+        rows, cols = np.triu_indices(len(remaining), k=1)
+        k = np.argmax(np.abs(M[rows, cols]))
+        a, b = int(rows[k]), int(cols[k])
+        sign = 1 if M[a, b] >= 0 else -1
+        fixed.append((remaining[a], remaining[b], sign))
+        cost_diag = eliminate_qubit(cost_diag, a, b, sign)
+        del remaining[b]
+
+    m = len(remaining)
+    best = int(np.argmax(cost_diag))
+    bits = {q: (best >> (m - 1 - i)) & 1 for i, q in enumerate(remaining)}
+    for a, b, sign in reversed(fixed):
+        bits[b] = bits[a] ^ (1 if sign < 0 else 0)
+
+    assignment = [bits[q] for q in range(n)]
+    w = np.ones(len(edges)) if weights is None else np.asarray(weights, dtype=float)
+    cut = float(sum(wk for (i, j), wk in zip(edges, w) if assignment[i] != assignment[j]))
+    return {
+        "assignment": assignment,
+        "cut": cut,
+        "fixed": {(a, b): sign for a, b, sign in fixed},
+        "correlations": correlations,
+    }
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+import numpy as np
+from instrumentation import record_cache
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "QAOA_CACHE_PATH",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "../../output/cache/results.sqlite")),
+)
+# Salted into every key; bump it when a code change alters optimization
+# results so entries computed by the old code are no longer returned.
+CACHE_VERSION = 2
+
+def _canonical(value):
+    """JSON-friendly form with floats rounded so equal runs hash equally."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (float, np.floating)):
+        return float(np.round(float(value), 12))
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+def graph_fingerprint(n, edges, weights=None):
+    """Content hash of a weighted graph, independent of edge order and orientation."""
+    weights = [1.0] * len(edges) if weights is None else list(weights)
+    canon = sorted((min(i, j), max(i, j), float(w)) for (i, j), w in zip(edges, weights))
+    return hashlib.sha256(json.dumps([n, _canonical(canon)]).encode()).hexdigest()
+
+class ResultCache:
+    """
+    On-disk LRU cache for optimization results, shared by threads and server
+    processes through SQLite (WAL mode, one short connection per call).
+    Entries beyond max_entries are evicted by least recent access.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("CREATE TABLE IF NOT EXISTS results ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)")
+            con.execute("CREATE INDEX IF NOT EXISTS results_lru ON results(last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # commit (or roll back) the block, then close the connection
+        con = sqlite3.connect(self.path, timeout=30.0)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def make_key(**fields):
+        fields = {**fields, "cache_version": CACHE_VERSION}
+        return hashlib.sha256(json.dumps(_canonical(fields), sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        with self._connect() as con:
+            row = con.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            record_cache("result_cache", row is not None)
+            if row is None:
+                return None
+            con.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        with self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                        (key, json.dumps(_canonical(value)), time.time()))
+            con.execute("DELETE FROM results WHERE key IN (SELECT key FROM results "
+                        "ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def __len__(self):
+        with self._connect() as con:
+            return con.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+def cached_optimization(cache, problem_key, p, H_P, H_M, method, init, dense_mixer=False):
+    """
+    run_optimization through the cache. Runs without an explicit init are
+    not reproducible and bypass it. Returns (params, cost, nfev, hit).
+    """
+    from optimizer_module import run_optimization, METHOD_OPTIONS
+
+    if cache is None or problem_key is None or init is None:
+        params, cost, nfev = run_optimization(p, H_P, H_M, method=method, init=init,
+                                              dense_mixer=dense_mixer)
+        return params, cost, nfev, False
+
+    key = cache.make_key(kind="optimization", problem=problem_key, p=p, method=method,
+                         init=init, options={"dense_mixer": dense_mixer, **METHOD_OPTIONS.get(method, {})})
+    hit = cache.get(key)
+    if hit is not None:
+        return np.array(hit["params"]), hit["cost"], hit["nfev"], True
+
+    params, cost, nfev = run_optimization(p, H_P, H_M, method=method, init=init,
+                                          dense_mixer=dense_mixer)
+    cache.put(key, {"params": params, "cost": cost, "nfev": nfev})
+    return params, cost, nfev, False
+
+def cached_tqa_expectation(cache, problem_key, p, H_P, T=5.0):
+    """TQA energy <C>(p, T), cached like the optimization runs."""
+    from adiabatic import tqa_params
+    from qaoa_core import qaoa_expectation
+
+    gammas, betas = tqa_params(p, T=T)
+    compute = lambda: qaoa_expectation(np.concatenate([gammas, betas]), p, H_P)
+    if cache is None or problem_key is None:
+        return compute()
+    key = cache.make_key(kind="tqa", problem=problem_key, p=p, T=T)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit["cost"]
+    cost = compute()
+    cache.put(key, {"cost": cost})
+    return cost
@@ -0,0 +1,50 @@
+import numpy as np
+from hamiltonian import as_cost_diagonal
+
+class BitstringSampler:
+    """
+    Draws basis-state indices from |psi|^2. The cumulative table is built
+    once (O(2^n)); each draw is then a binary search, and whole count
+    vectors come from a single multinomial draw.
+    """
+
+    def __init__(self, psi, seed=None):
+        self.probs = np.abs(psi) ** 2
+        self.probs /= self.probs.sum()
+        self.cdf = np.cumsum(self.probs)
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+    def sample(self, shots):
+        """Basis-state index of every shot."""
+        u = self.rng.random(shots) * self.cdf[-1]
+        return np.minimum(np.searchsorted(self.cdf, u, side="right"), len(self.cdf) - 1)
+
+    def counts(self, shots):
+        """Number of shots landing on each basis state."""
+        return self.rng.multinomial(shots, self.probs)
+
+def counts_statistics(counts, H_P, alpha=0.1):
+    """
+    Sampled mean, CVaR_alpha (mean of the best alpha fraction of shots, for
+    maximization) and the best sampled cut from a counts vector.
+    """
+    cost_diag = as_cost_diagonal(H_P)
+    shots = counts.sum()
+    seen = np.flatnonzero(counts)
+    order = seen[np.argsort(-cost_diag[seen], kind="stable")]
+    top = max(1.0, alpha * shots)
+    taken = np.minimum(counts[order], np.maximum(0.0, top - (np.cumsum(counts[order]) - counts[order])))
+    return {
+        "mean": float(np.dot(counts[seen], cost_diag[seen]) / shots),
+        "cvar": float(np.dot(taken, cost_diag[order]) / taken.sum()),
+        "best_cut": float(cost_diag[order[0]]),
+        "best_state": int(order[0]),
+        "shots": int(shots),
+    }
+
+def sample_qaoa(psi, H_P, shots=1024, alpha=0.1, seed=None):
+    """Finite-shot estimates for the state psi; also returns the counts."""
+    counts = BitstringSampler(psi, seed).counts(shots)
+    stats = counts_statistics(counts, H_P, alpha)
+    stats["counts"] = counts
+    return stats
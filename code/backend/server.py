@@ -1,19 +1,19 @@
 # server.py
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 import numpy as np, os, time, json, traceback, shutil, threading
 
-from hamiltonian import build_problem_hamiltonian, build_mixer_hamiltonian
-from optimizer_module import run_optimization
-from fourier_heuristic import fourier_heuristic_params
+from hamiltonian import build_cost_diagonal
+from jobs import JobManager, JobCancelled, QueueFull, ProgressBoard, check_cancelled
+from portfolio import OptimizerPortfolio
+from fourier_heuristic import interp_params
+from result_cache import ResultCache, graph_fingerprint, cached_tqa_expectation
 from recursive_qaoa import recursive_qaoa
-from visualization_module import (
-    plot_energy_landscape, plot_correlation_heatmap,
-    plot_noise_vs_ratio, plot_adiabatic_fidelity,
-    plot_qaoa_vs_tqa, plot_param_schedules
-)
-from qaoa_core import qaoa_expectation
-from adiabatic import tqa_params
+from qaoa_core import qaoa_state, zz_correlations
+from noise_model import noise_sweep
+from plot_renderer import PlotRenderer
+import instrumentation
+from instrumentation import stage
 
 # ---------------------------------------------------------------------
 # PATH SETUP — handles the correct directory for output outside /code
@@ -23,6 +23,7 @@ BACKEND_STATIC_DIR = os.path.join(BASE_DIR, "output", "static")
 os.makedirs(BACKEND_STATIC_DIR, exist_ok=True)
 
 RESULT_FILE = os.path.join(BACKEND_STATIC_DIR, "results.json")
+JOBS_DIR = os.path.join(BASE_DIR, "output", "jobs")
 
 # ---------------------------------------------------------------------
 
@@ -31,166 +32,333 @@ app = Flask(
     static_folder="../frontend",  # Serve frontend folder
     static_url_path=""            # Available at root
 )
-CORS(app, resources={r"/*": {"origins": "*"}})
+CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=["ETag"])
 
-is_computing = False
 lock = threading.Lock()
 
 # ---------------------------------------------------------------------
 
-def compute_results():
-    """Main QAOA + visualization run."""
+DEFAULT_SPEC = {
+    "n": 3,
+    "edges": [(0, 1), (1, 2), (2, 0)],
+    "weights": None,
+    "p_values": [1, 2, 3],
+    "methods": ["COBYLA", "Nelder-Mead", "Bayesian"],
+    "noise_levels": [0.0, 0.01, 0.02, 0.05, 0.1],
+}
+MAX_JOB_QUBITS = 20
+JOB_METHODS = {"COBYLA", "Nelder-Mead", "Bayesian", "L-BFGS-B", "BFGS"}
+
+def parse_job_spec(payload):
+    """Validate a POST /jobs body and fill in defaults; raises ValueError."""
+    payload = payload or {}
+    if not isinstance(payload, dict):
+        raise ValueError("the job spec must be a JSON object")
+    try:
+        return _fill_job_spec(payload)
+    except (TypeError, IndexError, AttributeError) as e:
+        # wrong JSON types, e.g. a number where a list of edges belongs
+        raise ValueError(f"malformed job spec: {e}") from e
+
+def _fill_job_spec(payload):
+    spec = dict(DEFAULT_SPEC)
+    if "edges" in payload:
+        edges = [tuple(int(v) for v in e) for e in payload["edges"]]
+        if not edges or any(len(e) != 2 or e[0] == e[1] or min(e) < 0 for e in edges):
+            raise ValueError("edges must be a non-empty list of [i, j] pairs with i != j")
+        spec.update(edges=edges, n=int(payload.get("n", max(max(e) for e in edges) + 1)),
+                    weights=None)
+    if payload.get("weights") is not None:
+        spec["weights"] = [float(w) for w in payload["weights"]]
+        if len(spec["weights"]) != len(spec["edges"]):
+            raise ValueError("weights must have one entry per edge")
+    if not 2 <= spec["n"] <= MAX_JOB_QUBITS or max(max(e) for e in spec["edges"]) >= spec["n"]:
+        raise ValueError(f"n must cover every node and lie in [2, {MAX_JOB_QUBITS}]")
+    if "p_values" in payload:
+        spec["p_values"] = sorted({int(p) for p in payload["p_values"]})
+        if not spec["p_values"] or spec["p_values"][0] < 1 or spec["p_values"][-1] > 10:
+            raise ValueError("p_values must be depths between 1 and 10")
+    if "methods" in payload:
+        spec["methods"] = list(payload["methods"])
+        if not spec["methods"] or not set(spec["methods"]) <= JOB_METHODS:
+            raise ValueError(f"methods must be a subset of {sorted(JOB_METHODS)}")
+    if "noise_levels" in payload:
+        spec["noise_levels"] = [float(v) for v in payload["noise_levels"]]
+    return spec
+
+def compute_results(spec=None, out_dir=BACKEND_STATIC_DIR, cancel_event=None):
+    """
+    Main QAOA + visualization run for one graph spec (DEFAULT_SPEC: the
+    triangle). Everything is written to out_dir; cancel_event is checked
+    between stages. results.json is written as soon as the numbers are
+    ready; the figures render afterwards in the plot_renderer pool.
+    Partial results (each depth, each optimizer score, each finished plot)
+    are published to progress_board under out_dir as they arrive.
+    """
+    spec = spec or DEFAULT_SPEC
+    result_file = os.path.join(out_dir, "results.json")
+    progress = progress_board.start(os.path.abspath(out_dir), {
+        "status": "processing", "stage": "optimize",
+        "p_values": spec["p_values"], "performance_ratios": [], "tqa_ratios": [],
+        "optimizer_labels": spec["methods"], "optimizer_scores": [None] * len(spec["methods"]),
+        "plots": {}, "plots_ready": [],
+    })
     try:
         # Cleanup old files
-        for f in os.listdir(BACKEND_STATIC_DIR):
-            fp = os.path.join(BACKEND_STATIC_DIR, f)
+        plot_renderer.forget(out_dir)
+        os.makedirs(out_dir, exist_ok=True)
+        for f in os.listdir(out_dir):
+            fp = os.path.join(out_dir, f)
             if os.path.isfile(fp) or os.path.islink(fp):
                 os.unlink(fp)
             elif os.path.isdir(fp):
                 shutil.rmtree(fp)
 
-        n = 3
-        edges = [(0, 1), (1, 2), (2, 0)]
-        H_P = build_problem_hamiltonian(n, edges)
-        H_M = build_mixer_hamiltonian(n)
-        C_max = float(np.max(np.diag(H_P)))
-
-        p_values = [1, 2, 3]
+        timings = {}
+        n, edges, weights = spec["n"], spec["edges"], spec["weights"]
+        with stage("hamiltonian", timings):
+            H_P = build_cost_diagonal(n, edges, weights)
+        C_max = float(np.max(H_P))
+        cache = ResultCache()
+        problem_key = graph_fingerprint(n, edges, weights)
+
+        p_values = spec["p_values"]
+        p_top = p_values[-1]
+        optimizer_labels = spec["methods"]
         ratios_qaoa, ratios_tqa = [], []
         best_params_for_plot = None
+        scores_by_method = {}
         start = time.time()
 
-        for p in p_values:
-            init = fourier_heuristic_params(p)
-            best_cost, best_params = -1e9, None
-            for method in ["COBYLA", "Nelder-Mead", "Bayesian"]:
-                params, cost, _ = run_optimization(p, H_P, H_M, method=method, init=init)
-                if cost > best_cost:
-                    best_cost, best_params = cost, np.array(params)
-            ratios_qaoa.append(float(best_cost / C_max))
-            if p == 3:
-                best_params_for_plot = best_params
-
-            gammas_tqa, betas_tqa = tqa_params(p, T=5.0)
-            params_tqa = np.concatenate([gammas_tqa, betas_tqa])
-            tqa_cost = qaoa_expectation(params_tqa, p, H_P, H_M)
-            ratios_tqa.append(float(tqa_cost / C_max))
+        with OptimizerPortfolio(H_P, max_workers=len(optimizer_labels),
+                                cache=cache, problem_key=problem_key) as portfolio:
+            best = None
+            for p in p_values:
+                check_cancelled(cancel_event)
+                # the first depth starts from the Fourier heuristic, deeper
+                # layers from the INTERP warm start of the previous optimum
+                with stage("optimize", timings):
+                    if best is None or best["p"] != p - 1:
+                        results = portfolio.iter_results(p, methods=optimizer_labels)
+                    else:
+                        results = portfolio.iter_results(p, methods=optimizer_labels,
+                                                         init=interp_params(best["params"]),
+                                                         heuristic=False)
+                    jobs = []
+                    for r in results:
+                        jobs.append(r)
+                        if p == p_top:
+                            scores = {m: max((float(j["ratio"]) for j in jobs if j["method"] == m),
+                                             default=None) for m in optimizer_labels}
+                            progress.update(optimizer_scores=[scores[m] for m in optimizer_labels])
+                best = max(jobs, key=lambda r: r["cost"])
+                ratios_qaoa.append(float(best["ratio"]))
+                if p == p_top:
+                    best_params_for_plot = best["params"]
+                    # the optimizer comparison reuses the deepest runs
+                    scores_by_method = {r["method"]: float(r["ratio"]) for r in jobs}
+
+                with stage("tqa", timings):
+                    tqa_cost = cached_tqa_expectation(cache, problem_key, p, H_P, T=5.0)
+                ratios_tqa.append(float(tqa_cost / C_max))
+                progress.update(performance_ratios=list(ratios_qaoa), tqa_ratios=list(ratios_tqa),
+                                best_ratio=float(max(ratios_qaoa)))
 
         duration = time.time() - start
-        corrs = recursive_qaoa(n, edges)
-        corrs_clean = {k: float(v) for k, v in corrs.items()} if isinstance(corrs, dict) else {}
-
-        noise_levels = [0.0, 0.01, 0.02, 0.05, 0.1]
-        base_ratio = ratios_qaoa[-1]
-        noisy_ratios = [max(0.0, base_ratio * (1 - 1.5 * nl)) for nl in noise_levels]
-
-        # --- generate plots (all saved to BACKEND_STATIC_DIR) ---
-        plot_energy_landscape(H_P, H_M, p=1)
-        plot_correlation_heatmap(corrs_clean)
-        plot_noise_vs_ratio(noise_levels, noisy_ratios)
-        plot_adiabatic_fidelity(H_P, H_M, T=10.0, steps=300)
-        plot_qaoa_vs_tqa(p_values, ratios_qaoa, ratios_tqa)
-
+        progress.update(stage="analysis", execution_time=float(duration))
+        check_cancelled(cancel_event)
+        with stage("rqaoa", timings):
+            rqaoa = recursive_qaoa(n, edges, weights=weights)
+        # heatmap shows <Z_i Z_j> of the best optimized state at the deepest p
+        with stage("correlations", timings):
+            M = zz_correlations(qaoa_state(best_params_for_plot, p_top, H_P))
+        corrs_clean = {(i, j): float(M[i, j]) for i in range(n) for j in range(i + 1, n)}
+
+        noise_levels = spec["noise_levels"]
+        with stage("noise", timings):
+            noisy_costs = noise_sweep(best_params_for_plot, p_top, H_P, noise_levels,
+                                      channel="depolarizing", trajectories=512, seed=0)
+        noisy_ratios = [float(c / C_max) for c in noisy_costs]
+
+        # --- queue plots (rendered into out_dir by the renderer pool) ---
+        check_cancelled(cancel_event)
+        plot_specs = {
+            "energy_landscape": {"H_P": H_P, "H_M": None, "p": 1},
+            "correlation_heatmap": {"corrs": corrs_clean},
+            "noise_sensitivity": {"noise_levels": noise_levels, "ratios": noisy_ratios},
+            "adiabatic_fidelity": {"H_P": H_P, "H_M": None, "T": 10.0, "steps": 300},
+            "qaoa_vs_tqa": {"p_values": p_values, "ratios_qaoa": ratios_qaoa,
+                            "ratios_tqa": ratios_tqa},
+        }
         if best_params_for_plot is not None:
-            p = 3
-            gammas = best_params_for_plot[:p]
-            betas = best_params_for_plot[p:2*p]
-            plot_param_schedules(gammas, betas)
-
-        optimizer_labels = ["COBYLA", "Nelder-Mead", "Bayesian"]
-        optimizer_scores = []
-        init_p3 = fourier_heuristic_params(3)
-        for method in optimizer_labels:
-            params, cost, _ = run_optimization(3, H_P, H_M, method=method, init=init_p3)
-            optimizer_scores.append(float(cost / C_max))
+            plot_specs["params_schedule"] = {"gammas": best_params_for_plot[:p_top],
+                                             "betas": best_params_for_plot[p_top:2*p_top]}
+
+        optimizer_scores = [scores_by_method[m] for m in optimizer_labels]
+        with stage("plots_submit", timings):
+            plots = plot_renderer.submit_all(plot_specs, out_dir,
+                                             on_ready=lambda name: progress.append("plots_ready", name))
 
         result = {
             "status": "done",
             "best_ratio": float(max(ratios_qaoa)),
             "execution_time": float(duration),
-            "optimizer": "Hybrid (best of COBYLA/NM/Bayesian)",
+            "optimizer": f"Hybrid (best of {'/'.join(optimizer_labels)})",
             "performance_ratios": ratios_qaoa,
             "tqa_ratios": ratios_tqa,
             "p_values": p_values,
             "optimizer_labels": optimizer_labels,
             "optimizer_scores": optimizer_scores,
-            "plots": {
-                "energy_landscape": "energy_landscape.png",
-                "correlation_heatmap": "correlation_heatmap.png",
-                "noise_sensitivity": "noise_sensitivity.png",
-                "adiabatic_fidelity": "adiabatic_fidelity.png",
-                "qaoa_vs_tqa": "qaoa_vs_tqa.png",
-                "params_schedule": "params_schedule.png",
-            },
+            "rqaoa_ratio": float(rqaoa["cut"] / C_max),
+            "noise_levels": noise_levels,
+            "noisy_ratios": noisy_ratios,
+            "plots": plots,
+            "stage_timings": {k: float(v) for k, v in timings.items()},
         }
 
-        with open(RESULT_FILE, "w", encoding="utf-8") as f:
+        with open(result_file, "w", encoding="utf-8") as f:
             json.dump(result, f, indent=2)
+        progress.update(**result, stage="plots")
 
         return result
 
+    except JobCancelled:
+        progress.update(status="cancelled")
+        raise
     except Exception as e:
         traceback.print_exc()
         err = {"status": "error", "message": str(e)}
-        with open(RESULT_FILE, "w", encoding="utf-8") as f:
+        progress.update(**err)
+        with open(result_file, "w", encoding="utf-8") as f:
             json.dump(err, f)
         return err
 
-# ---------------------------------------------------------------------
+plot_renderer = PlotRenderer(max_workers=2)
+progress_board = ProgressBoard()
+
+def _evicted(job_id, out_dir):
+    progress_board.drop(os.path.abspath(out_dir))
+    plot_renderer.forget(out_dir)
+
+job_manager = JobManager(compute_results, JOBS_DIR, max_workers=2, max_queued=16,
+                         board=progress_board, on_evict=_evicted)
+DASHBOARD_JOB = "dashboard"  # the fixed-graph run behind /results and /status
 
 @app.route("/")
 def index():
     return send_from_directory("../frontend", "index.html")
 
+def _send_output(out_dir, filename):
+    """
+    A file of a run's output directory. Images still rendering are waited
+    for a few seconds, then answered with 202 so no request thread is held
+    for a whole render; known images that are missing are drawn on demand.
+    """
+    name = os.path.basename(filename)
+    path = os.path.join(out_dir, name)
+    if not plot_renderer.ensure(path) and plot_renderer.rendering(path):
+        return jsonify({"status": "rendering"}), 202, {"Retry-After": "2"}
+    return send_from_directory(out_dir, name)
+
 @app.route("/output/static/<path:filename>")
 def serve_backend_static(filename):
     """Serve images and results from /output/static (outside /code)."""
-    abs_path = os.path.abspath(os.path.join(BACKEND_STATIC_DIR, filename))
-    return send_from_directory(BACKEND_STATIC_DIR, os.path.basename(abs_path))
+    return _send_output(BACKEND_STATIC_DIR, filename)
+
+def _load_results(result_file):
+    """results.json of a run this server has not seen (e.g. before a restart)."""
+    try:
+        with open(result_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"status": "processing"}
+    if data.get("status") == "done":
+        # images missing on disk are drawn on request by plot_renderer.ensure
+        data.setdefault("plots_ready", list(data.get("plots", {})))
+    return data
+
+def _snapshot(out_dir):
+    out_dir = os.path.abspath(out_dir)
+    return progress_board.seed(out_dir, lambda: _load_results(os.path.join(out_dir, "results.json")))
+
+def _finished(data):
+    status = data.get("status")
+    if status == "done":
+        return set(data.get("plots_ready", [])) >= set(data.get("plots", {}))
+    return status in ("error", "cancelled")
+
+def _status_response(out_dir):
+    """
+    Latest (partial) results from memory with an ETag; If-None-Match gets a
+    304. With ?wait=<s> (up to 30) an unchanged snapshot is long-polled.
+    """
+    key = os.path.abspath(out_dir)
+    etag, _, body = _snapshot(key)
+    wait = min(request.args.get("wait", 0, type=float), 30.0)
+    if wait > 0 and etag in request.if_none_match:
+        etag, _, body = progress_board.wait(key, etag, timeout=wait)
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+def _event_stream(out_dir, active, last_id=None):
+    """
+    Server-Sent Events: one message per new snapshot until the run is
+    finished, its snapshot is dropped, or (seen at a keep-alive) its job is
+    no longer active without ever reporting an end.
+    """
+    key = os.path.abspath(out_dir)
+    _snapshot(key)
+    etag = last_id
+    while True:
+        new, data, body = progress_board.wait(key, etag, timeout=15.0)
+        if new is None:
+            return
+        if new == etag:
+            if not active():
+                return
+            yield ": keep-alive\n\n"
+            continue
+        etag = new
+        yield f"id: {etag}\ndata: {body}\n\n"
+        if _finished(data):
+            return
+
+def _events_response(out_dir, job_id):
+    active = lambda: job_manager.is_active(job_id)
+    return Response(_event_stream(out_dir, active, request.headers.get("Last-Event-ID")),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route("/results", methods=["GET"])
 def results():
-    global is_computing
-
-    if os.path.exists(RESULT_FILE):
-        try:
-            with open(RESULT_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if data.get("status") == "done":
-                return jsonify(data)
-        except json.JSONDecodeError:
-            pass
+    _, data, _ = _snapshot(BACKEND_STATIC_DIR)
+    if data.get("status") == "done":
+        return jsonify(data)
 
     with lock:
-        if is_computing:
-            return jsonify({"status": "processing"})
-        is_computing = True
-
-    def background_task():
-        global is_computing
-        try:
-            compute_results()
-        finally:
-            with lock:
-                is_computing = False
-
-    threading.Thread(target=background_task, daemon=True).start()
+        if not job_manager.is_active(DASHBOARD_JOB):
+            job_manager.submit(DEFAULT_SPEC, job_id=DASHBOARD_JOB, out_dir=BACKEND_STATIC_DIR)
     return jsonify({"status": "processing"})
 
 @app.route("/status", methods=["GET"])
 def status():
-    if os.path.exists(RESULT_FILE):
-        try:
-            with open(RESULT_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return jsonify(data)
-        except json.JSONDecodeError:
-            return jsonify({"status": "processing"})
-    return jsonify({"status": "processing"})
+    return _status_response(BACKEND_STATIC_DIR)
+
+@app.route("/events", methods=["GET"])
+def events():
+    """Partial dashboard results as Server-Sent Events."""
+    return _events_response(BACKEND_STATIC_DIR, DASHBOARD_JOB)
 
 @app.route("/reset", methods=["POST"])
 def reset_results():
     try:
+        # the cancelled run stops at its next stage; clear the directory only
+        # once it has, so it cannot write into the fresh one
+        job_manager.cancel(DASHBOARD_JOB)
+        if not job_manager.wait(DASHBOARD_JOB, timeout=60):
+            return jsonify({"status": "error", "message": "previous run is still stopping"}), 409
         for f in os.listdir(BACKEND_STATIC_DIR):
             fp = os.path.join(BACKEND_STATIC_DIR, f)
             if os.path.isfile(fp) or os.path.islink(fp):
@@ -199,11 +367,58 @@ def reset_results():
                 shutil.rmtree(fp)
         with open(RESULT_FILE, "w", encoding="utf-8") as f:
             json.dump({"status": "processing"}, f)
+        progress_board.start(BACKEND_STATIC_DIR, {"status": "processing"})
         return jsonify({"status": "reset"}), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # ---------------------------------------------------------------------
+# Job API: many graphs / users at once, each job in its own output directory
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    try:
+        spec = parse_job_spec(request.get_json(silent=True))
+        job_id = job_manager.submit(spec)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except QueueFull as e:
+        return jsonify({"status": "error", "message": str(e)}), 429
+    return jsonify({"job_id": job_id, "state": "queued"}), 202
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "unknown job"}), 404
+    return jsonify(job)
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    if job_manager.get(job_id) is None:
+        return jsonify({"status": "error", "message": "unknown job"}), 404
+    return jsonify({"job_id": job_id, "cancelled": job_manager.cancel(job_id)})
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id):
+    out_dir = job_manager.output_dir(job_id)
+    if out_dir is None:
+        return jsonify({"status": "error", "message": "unknown job"}), 404
+    return _events_response(out_dir, job_id)
+
+@app.route("/jobs/<job_id>/output/<path:filename>")
+def job_output(job_id, filename):
+    out_dir = job_manager.output_dir(job_id)
+    if out_dir is None:
+        return jsonify({"status": "error", "message": "unknown job"}), 404
+    return _send_output(out_dir, filename)
+
+# ---------------------------------------------------------------------
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Call counts, latencies and cache hit rates in Prometheus text format."""
+    return instrumentation.prometheus_text(), 200, {"Content-Type": "text/plain; version=0.0.4"}
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -1,5 +1,194 @@
 import numpy as np
+from hamiltonian import _edge_arrays, cost_diagonal_chunk, build_cost_diagonal
+from qaoa_core import apply_x_mixer, apply_x_sum
 
 def reduce_hilbert_space(H_P, H_M, symmetry_fn):
     mask = symmetry_fn(np.arange(H_P.shape[0]))
     return H_P[np.ix_(mask, mask)], H_M[np.ix_(mask, mask)]
+
+# ---------- Global Z2 bit-flip parity ----------
+class Z2ParityMixer:
+    """
+    X-mixer restricted to the even sector of the global flip P = X^{(x)n}.
+    Both H_M and the MaxCut cost commute with P and |+>^n is even, so QAOA
+    never leaves the sector spanned by (|x> + |~x>)/sqrt(2). The
+    representatives are the x with qubit 0 = 0, i.e. the first 2^(n-1)
+    indices; the partner of representative y under X_0 is ~x with bit 0
+    cleared, which is index 2^(n-1) - 1 - y.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.dim = 2 ** (n - 1)
+
+    def initial_state(self):
+        return np.full(self.dim, 1 / np.sqrt(self.dim), dtype=complex)
+
+    def apply(self, psi, beta):
+        apply_x_mixer(psi, beta, self.n - 1)
+        return np.cos(beta) * psi - 1j * np.sin(beta) * psi[::-1]
+
+    def apply_generator(self, psi):
+        return apply_x_sum(psi, self.n - 1) + psi[::-1]
+
+    def expand(self, psi):
+        """Full 2^n amplitudes of a reduced state."""
+        return np.concatenate([psi, psi[::-1]]) / np.sqrt(2)
+
+def z2_reduction(n, edges, weights=None):
+    """Reduced cost diagonal (first half of the full one) and Z2 mixer."""
+    edges, weights = _edge_arrays(edges, weights)
+    return cost_diagonal_chunk(n, edges, weights, 0, 2 ** (n - 1)), Z2ParityMixer(n)
+
+# ---------- Graph automorphism orbits ----------
+def _adjacency(n, edges, weights):
+    edges, weights = _edge_arrays(edges, weights)
+    adj = {}
+    for (i, j), w in zip(edges.tolist(), weights.tolist()):
+        adj[(i, j)] = adj[(j, i)] = w
+    degree = [sum(1 for (a, _) in adj if a == v) for v in range(n)]
+    return adj, degree
+
+def _search(n, adj, degree, perm, found, limit):
+    """Extend the partial permutation perm to automorphisms by backtracking with degree pruning."""
+    if len(found) >= limit:
+        return
+    v = len(perm)
+    if v == n:
+        found.append(list(perm))
+        return
+    used = set(perm)
+    for image in range(n):
+        if image in used or degree[image] != degree[v]:
+            continue
+        if all(adj.get((u, v)) == adj.get((perm[u], image)) for u in range(v)):
+            perm.append(image)
+            _search(n, adj, degree, perm, found, limit)
+            perm.pop()
+
+def graph_automorphisms(n, edges, weights=None, limit=1000):
+    """
+    Qubit permutations preserving the weighted edge set, found by
+    backtracking with degree pruning. At most `limit` are returned; any
+    subset still generates a valid symmetry subgroup.
+    """
+    adj, degree = _adjacency(n, edges, weights)
+    found = []
+    _search(n, adj, degree, [], found, limit)
+    return [perm for perm in found if perm != list(range(n))]
+
+def _orbit(point, generators):
+    orbit, frontier = {point}, [point]
+    while frontier:
+        q = frontier.pop()
+        for perm in generators:
+            if perm[q] not in orbit:
+                orbit.add(perm[q])
+                frontier.append(perm[q])
+    return orbit
+
+def automorphism_generators(n, edges, weights=None):
+    """
+    A generating set of the full automorphism group (Schreier-Sims style):
+    going from the last qubit to the first, for the stabilizer of qubits
+    0..v-1 one automorphism is searched for each image of v not yet in the
+    orbit of v under the generators found so far. Every generator grows an
+    orbit, so there are at most n(n-1)/2 of them however large the group is.
+    """
+    adj, degree = _adjacency(n, edges, weights)
+    generators = []
+    for v in range(n - 1, -1, -1):
+        orbit = _orbit(v, generators)
+        for image in range(v + 1, n):
+            if image in orbit or degree[image] != degree[v]:
+                continue
+            if any(adj.get((u, v)) != adj.get((u, image)) for u in range(v)):
+                continue
+            found = []
+            _search(n, adj, degree, list(range(v)) + [image], found, 1)
+            if found:
+                generators.append(found[0])
+                orbit = _orbit(v, generators)
+    return generators
+
+def _permuted_indices(n, perm):
+    """Index of the basis state obtained by moving qubit q to perm[q]."""
+    idx = np.arange(2 ** n, dtype=np.int64)
+    out = np.zeros_like(idx)
+    for q in range(n):
+        out |= ((idx >> (n - 1 - q)) & 1) << (n - 1 - perm[q])
+    return out
+
+def basis_orbits(n, generators, include_flip=True):
+    """
+    Orbit label (smallest member) of every basis state under the group
+    generated by the qubit permutations and, optionally, the global flip.
+    Labels are propagated along generator images with pointer jumping;
+    the image array of one generator at a time is held in memory.
+    """
+    labels = np.arange(2 ** n, dtype=np.int64)
+    changed = True
+    while changed:
+        old = labels.copy()
+        for perm in generators:
+            img = _permuted_indices(n, perm)
+            np.minimum.at(labels, img, labels)
+            labels = np.minimum(labels, labels[img])
+            del img
+        if include_flip:
+            labels = np.minimum(labels, labels[::-1])
+        labels = labels[labels]
+        changed = not np.array_equal(old, labels)
+    return labels
+
+class OrbitMixer:
+    """
+    X-mixer in the basis of normalized orbit states |O> = sum_{x in O} |x> / sqrt|O|.
+    <O'|sum X|O> = #{(x, k): x in O, x ^ e_k in O'} / sqrt(|O||O'|) is built
+    as a sparse matrix from the orbit labels, never from the full H_M.
+    """
+
+    def __init__(self, n, labels, dense_limit=2048):
+        from scipy.sparse import coo_matrix
+
+        reps, orbit_of = np.unique(labels, return_inverse=True)
+        self.n = n
+        self.dim = len(reps)
+        self.reps = reps
+        self.orbit_of = orbit_of
+        self.sizes = np.bincount(orbit_of).astype(float)
+        idx = np.arange(2 ** n, dtype=np.int64)
+        rows = np.concatenate([orbit_of[idx ^ (1 << k)] for k in range(n)])
+        cols = np.tile(orbit_of, n)
+        counts = coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(self.dim, self.dim)).tocsr()
+        scale = 1 / np.sqrt(self.sizes)
+        self.B = counts.multiply(scale[:, None]).multiply(scale[None, :]).tocsr()
+        self._eig = None
+        if self.dim <= dense_limit:
+            self._eig = np.linalg.eigh(self.B.toarray())
+
+    def initial_state(self):
+        return (np.sqrt(self.sizes) / np.sqrt(2 ** self.n)).astype(complex)
+
+    def apply(self, psi, beta):
+        if self._eig is not None:
+            w, V = self._eig
+            return V @ (np.exp(-1j * beta * w) * (V.T @ psi))
+        from scipy.sparse.linalg import expm_multiply
+        return expm_multiply(-1j * beta * self.B, psi)
+
+    def apply_generator(self, psi):
+        return self.B @ psi
+
+    def expand(self, psi):
+        return psi[self.orbit_of] / np.sqrt(self.sizes[self.orbit_of])
+
+def orbit_reduction(n, edges, weights=None, include_flip=True):
+    """
+    Reduced cost diagonal and OrbitMixer for the symmetry group of the graph
+    automorphisms (and the global flip). The cost is constant on each
+    orbit, so its value on the representative is the reduced diagonal.
+    """
+    generators = automorphism_generators(n, edges, weights)
+    mixer = OrbitMixer(n, basis_orbits(n, generators, include_flip))
+    return build_cost_diagonal(n, edges, weights)[mixer.reps], mixer
@@ -1,15 +1,16 @@
 import numpy as np
-from hamiltonian import build_problem_hamiltonian, build_mixer_hamiltonian
-from optimizer_module import run_optimization
+from hamiltonian import build_cost_diagonal
+from portfolio import run_portfolio
 from fourier_heuristic import fourier_heuristic_params
-from symmetry_module import reduce_hilbert_space
-from concurrent.futures import ThreadPoolExecutor
+from symmetry_module import orbit_reduction
 from functools import lru_cache
 
 @lru_cache(maxsize=None)
-def _cached_build_hamiltonians(n, edges):
-    """Cache expensive Hamiltonian construction."""
-    return build_problem_hamiltonian(n, edges), build_mixer_hamiltonian(n)
+def _cached_build_problem(n, edges, use_symmetry):
+    """Cache cost diagonal / symmetry-reduced problem construction."""
+    if use_symmetry:
+        return orbit_reduction(n, list(edges))
+    return build_cost_diagonal(n, edges), None
 
 def run_task_b_optimizers(init_method="adiabatic", use_symmetry=True):
     """
@@ -19,24 +20,17 @@ def run_task_b_optimizers(init_method="adiabatic", use_symmetry=True):
     n = 3
     edges = [(0, 1), (1, 2), (2, 0)]
 
-    # Cached Hamiltonians
-    H_P, H_M = _cached_build_hamiltonians(n, tuple(edges))
-
-    # Optional symmetry reduction
-    if use_symmetry:
-        H_P, H_M = reduce_hilbert_space(H_P, H_M, lambda idx: idx % 2 == 0)
+    # Cached problem; with symmetry the state lives on automorphism x parity orbits
+    H_P, H_M = _cached_build_problem(n, tuple(edges), use_symmetry)
 
     # Initialization method
     init = fourier_heuristic_params(3) if init_method == "adiabatic" else np.random.rand(6)
 
-    # Parallel optimizer runs
-    def optimize_method(method):
-        params, cost, evals = run_optimization(3, H_P, H_M, method=method, init=init)
-        ratio = cost / np.max(np.diag(H_P))
-        return {"optimizer": method, "cost": cost, "evals": evals, "ratio": ratio}
-
+    # Parallel optimizer runs, one worker process per method
     methods = ["COBYLA", "Nelder-Mead", "Bayesian"]
-    with ThreadPoolExecutor(max_workers=len(methods)) as ex:
-        results = list(ex.map(optimize_method, methods))
+    jobs = run_portfolio(H_P, 3, H_M=H_M, max_workers=len(methods),
+                         methods=methods, init=init, heuristic=False)
+    by_method = {job["method"]: job for job in jobs}
 
-    return results
\ No newline at end of file
+    return [{"optimizer": m, "cost": by_method[m]["cost"], "evals": by_method[m]["nfev"],
+             "ratio": by_method[m]["ratio"]} for m in methods]
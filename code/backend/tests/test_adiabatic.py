@@ -0,0 +1,26 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal, build_mixer_hamiltonian
+from adiabatic import simulate_continuous_adiabatic, simulate_adiabatic_fast, optimal_subspace_fidelity
+
+def test_fast_adiabatic_matches_dense_expm():
+    n = 4
+    edges = [(0, 1), (1, 2), (2, 3), (3, 0)]
+    H_P = build_cost_diagonal(n, edges)
+    H_M = build_mixer_hamiltonian(n)
+    _, fids_ref, psi_ref = simulate_continuous_adiabatic(H_P, H_M, T=5.0, steps=400)
+    for method in ("trotter", "krylov"):
+        _, fids, psi = simulate_adiabatic_fast(H_P, T=5.0, steps=400, method=method)
+        assert abs(np.vdot(psi_ref, psi)) > 0.999
+        assert np.allclose(fids, fids_ref, atol=1e-2)  # both measure the optimal subspace
+        assert np.isclose(fids[-1], np.sum(np.abs(psi[H_P == H_P.max()]) ** 2))
+
+def test_adaptive_steps_reach_final_time():
+    H_P = build_cost_diagonal(3, [(0, 1), (1, 2), (2, 0)])
+    times, fids, _ = simulate_adiabatic_fast(H_P, T=10.0, steps=10, tol=1e-4)
+    assert np.isclose(times[-1], 10.0) and fids[-1] > 0.9
+
+def test_optimal_subspace_fidelity_accepts_batches():
+    cost = np.array([0.0, 2.0, 2.0, 0.0])
+    psi = np.eye(4)
+    assert optimal_subspace_fidelity(psi[1], cost) == 1.0
+    assert np.allclose(optimal_subspace_fidelity(psi, cost), [0, 1, 1, 0])
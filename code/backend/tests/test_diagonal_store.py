@@ -0,0 +1,29 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal, as_cost_diagonal
+from graphs import write_edge_list
+from diagonal_store import build_diagonal_store, build_diagonal_store_from_file, open_diagonal
+from qaoa_core import qaoa_expectation
+from portfolio import OptimizerPortfolio
+
+def test_store_matches_in_memory_diagonal_and_is_reused(tmp_path):
+    edges, weights = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)], [1.0, 2.0, 0.5, 1.0, 1.5]
+    edge_file = str(tmp_path / "g.txt")
+    write_edge_list(edge_file, edges, weights)
+    n, path = build_diagonal_store_from_file(edge_file, store_dir=str(tmp_path), chunk_elems=7)
+    assert n == 4
+    assert build_diagonal_store(4, edges[::-1], weights[::-1], store_dir=str(tmp_path)) == path
+    diag = open_diagonal(path)
+    assert not diag.flags.writeable
+    assert np.array_equal(diag, build_cost_diagonal(4, edges, weights))
+    # evaluation reads the mapped file directly
+    assert np.shares_memory(as_cost_diagonal(diag), diag)
+    params = np.array([0.4, 0.3])
+    assert np.isclose(qaoa_expectation(params, 1, diag),
+                      qaoa_expectation(params, 1, build_cost_diagonal(4, edges, weights)))
+
+def test_portfolio_workers_open_store_by_path(tmp_path):
+    path = build_diagonal_store(3, [(0, 1), (1, 2), (2, 0)], store_dir=str(tmp_path))
+    with OptimizerPortfolio(path, max_workers=2) as portfolio:
+        results = portfolio.run(1, methods=("L-BFGS-B",), n_random=1, seed=0)
+    assert portfolio.c_max == 2.0
+    assert all(r["ratio"] > 0.5 for r in results)
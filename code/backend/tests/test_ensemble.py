@@ -0,0 +1,31 @@
+import json
+import numpy as np
+from graphs import write_edge_list
+import ensemble
+from ensemble import family_instances, directory_instances, run_ensemble, _run_instance
+
+def test_ensemble_writes_lines_and_resumes(tmp_path):
+    out = str(tmp_path / "runs.jsonl")
+    instances = list(family_instances("3-regular", [4, 6], count=2))
+    assert run_ensemble(instances[:3], [1, 2], out, max_workers=2) == 3
+    with open(out, "a", encoding="utf-8") as f:
+        f.write('{"id": "3-regular/n6/s1", "n": 6, "co')  # crash mid-write
+    # only the missing instance is run, and the torn line is dropped
+    assert run_ensemble(instances, [1, 2], out, max_workers=2) == 1
+    with open(out, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["id"] for r in records) == sorted(i["id"] for i in instances)
+    assert all(len(r["ratio"]) == 2 and 0 < r["ratio"][0] <= r["ratio"][1] + 1e-6 <= 1 + 1e-6
+               for r in records)
+
+def test_directory_instances(tmp_path):
+    write_edge_list(str(tmp_path / "b.txt"), [(0, 1), (1, 2)], [1.0, 2.0])
+    write_edge_list(str(tmp_path / "a.txt"), [(0, 1)])
+    insts = list(directory_instances(str(tmp_path)))
+    assert [i["id"] for i in insts] == ["a.txt", "b.txt"] and insts[1]["weights"] == [1.0, 2.0]
+
+def test_workspaces_are_kept_per_dtype():
+    instance = next(family_instances("ring", [4], 1))
+    for dtype in (np.complex128, np.complex64):
+        _run_instance(instance, [1], "L-BFGS-B", dtype)
+        assert ensemble._workspaces[(4, np.dtype(dtype))].dtype == dtype
@@ -0,0 +1,13 @@
+import numpy as np
+from fourier_heuristic import interp_params, fourier_to_params, params_to_fourier, fourier_warm_start
+
+def test_interp_adds_one_layer_and_keeps_endpoints():
+    params = np.array([0.2, 0.4, 0.6, 0.5])
+    out = interp_params(params)
+    assert np.allclose(out, [0.2, 0.3, 0.4, 0.6, 0.55, 0.5])
+
+def test_fourier_round_trip_and_warm_start():
+    params = np.array([0.1, 0.3, 0.5, 0.6, 0.4, 0.2])
+    u, v = params_to_fourier(params)
+    assert np.allclose(fourier_to_params(u, v, 3), params)
+    assert fourier_warm_start(params).shape == (8,)
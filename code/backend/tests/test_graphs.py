@@ -0,0 +1,15 @@
+import numpy as np
+from graphs import random_regular_graph, erdos_renyi_graph, ring_graph, read_edge_list, write_edge_list
+
+def test_random_regular_graph_is_simple_and_regular():
+    edges = random_regular_graph(10, 3, seed=1)
+    degree = np.bincount(np.array(edges).ravel(), minlength=10)
+    assert len(set(edges)) == 15 and (degree == 3).all()
+    assert edges == random_regular_graph(10, 3, seed=1)
+
+def test_edge_list_round_trip(tmp_path):
+    path = str(tmp_path / "g.txt")
+    write_edge_list(path, ring_graph(4), [1.0, 2.0, 1.0, 0.5])
+    assert read_edge_list(path) == (4, ring_graph(4), [1.0, 2.0, 1.0, 0.5])
+    write_edge_list(path, erdos_renyi_graph(5, seed=0))
+    assert read_edge_list(path)[2] is None
@@ -1,8 +1,20 @@
 import numpy as np
-from hamiltonian import build_problem_hamiltonian
+from hamiltonian import build_problem_hamiltonian, build_cost_diagonal, build_operator_kron
 
 def test_problem_hamiltonian_maxcut():
     edges = [(0, 1), (1, 2), (2, 0)]
     H_P = build_problem_hamiltonian(3, edges)
     diag = np.diag(H_P)
     assert len(diag) == 8 and np.isclose(diag.max(), 2.0)
+
+def test_cost_diagonal_matches_kron_hamiltonian():
+    n = 4
+    edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+    H_ref = np.zeros((2**n, 2**n))
+    for (i, j) in edges:
+        H_ref += 0.5 * (np.eye(2**n) - build_operator_kron(n, {i: 'Z', j: 'Z'}))
+    assert np.allclose(build_cost_diagonal(n, edges), np.diag(H_ref))
+
+def test_cost_diagonal_weighted():
+    diag = build_cost_diagonal(2, [(0, 1)], weights=[2.5])
+    assert np.allclose(diag, [0.0, 2.5, 2.5, 0.0])
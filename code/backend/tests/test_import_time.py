@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY = {"scipy", "skopt", "sklearn", "matplotlib", "qiskit", "qiskit_aer"}
+
+def _import(modules):
+    """
+    Import numpy, then modules, in a fresh interpreter; return both import
+    times and the heavy packages now in sys.modules. Budgets are multiples
+    of the numpy import, so a slow or loaded machine scales both alike.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import numpy\n"
+        "numpy_time = time.perf_counter() - start\n"
+        "start = time.perf_counter()\n"
+        f"import {', '.join(modules)}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(numpy_time, elapsed, *sorted({{m.split('.')[0] for m in sys.modules}} & set({sorted(HEAVY)!r})))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), float(out[1]), out[2:]
+
+def test_core_imports_only_numpy():
+    numpy_time, elapsed, heavy = _import(["hamiltonian", "qaoa_core"])
+    assert heavy == []
+    assert elapsed < numpy_time  # about a tenth of it when nothing extra is pulled in
+
+def test_server_and_workers_start_without_heavy_dependencies():
+    numpy_time, elapsed, heavy = _import(["server", "portfolio", "optimizer_module", "ensemble", "noise_model"])
+    assert heavy == []
+    # flask and the backend take about 2x numpy; scipy + skopt alone add over 10x
+    assert elapsed < 6 * numpy_time
@@ -0,0 +1,60 @@
+import numpy as np
+import instrumentation
+from qaoa_core import qaoa_expectation
+from hamiltonian import build_cost_diagonal, build_mixer_hamiltonian
+
+def test_timers_and_expm_cache_counts():
+    instrumentation.set_enabled(True)
+    instrumentation.reset()
+    H_P = build_cost_diagonal(3, [(0, 1), (1, 2), (0, 2)])
+    H_M = build_mixer_hamiltonian(3)
+    for _ in range(3):
+        qaoa_expectation(np.array([0.3, 0.2]), 1, H_P, H_M, dense_mixer=True)
+    snap = instrumentation.snapshot()
+    assert snap["timers"]["qaoa_expectation"]["count"] == 3
+    assert snap["timers"]["qaoa_state"]["p99"] >= snap["timers"]["qaoa_state"]["p50"] > 0
+    # first expm is a miss, the repeats hit the lru cache
+    assert snap["caches"]["expm"]["hits"] >= 2
+    text = instrumentation.prometheus_text()
+    assert 'qaoa_latency_seconds_count{name="qaoa_expectation"} 3' in text
+    assert 'qaoa_cache_hit_ratio{cache="expm"}' in text
+
+def test_disabled_records_nothing_but_stage_timings():
+    instrumentation.reset()
+    instrumentation.set_enabled(False)
+    try:
+        timings = {}
+        with instrumentation.stage("work", timings):
+            build_cost_diagonal(3, [(0, 1)])
+        assert timings["work"] >= 0
+        assert instrumentation.snapshot()["timers"] == {}
+    finally:
+        instrumentation.set_enabled(True)
+
+def test_drain_and_merge_move_counters():
+    instrumentation.reset()
+    instrumentation.observe("job", 0.5)
+    instrumentation.record_cache("result_cache", True)
+    raw = instrumentation.drain()
+    assert instrumentation.snapshot()["timers"] == {}
+    instrumentation.merge(raw)
+    snap = instrumentation.snapshot()
+    assert snap["timers"]["job"]["total"] == 0.5
+    assert snap["caches"]["result_cache"]["hit_rate"] == 1.0
+
+def _observe_in_worker(_):
+    instrumentation.observe("worker", 0.01)
+    return instrumentation.drain()
+
+def test_forked_workers_do_not_resend_parent_counters():
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    instrumentation.set_enabled(True)
+    instrumentation.reset()
+    instrumentation.observe("x", 0.1, count=5)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("fork")) as pool:
+        for raw in pool.map(_observe_in_worker, range(4)):
+            instrumentation.merge(raw)
+    timers = instrumentation.snapshot()["timers"]
+    assert timers["x"]["count"] == 5
+    assert timers["worker"]["count"] == 4
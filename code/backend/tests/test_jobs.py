@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from jobs import JobManager, ProgressBoard, check_cancelled
+
+def _wait(manager, job_id):
+    while manager.is_active(job_id):
+        time.sleep(0.01)
+    return manager.get(job_id)
+
+def test_jobs_run_in_own_dirs_and_can_be_cancelled(tmp_path):
+    release = threading.Event()
+
+    def runner(spec, out_dir, cancel_event):
+        while spec.get("block") and not release.is_set():
+            check_cancelled(cancel_event)
+            time.sleep(0.01)
+        return {"status": "done", "out_dir": out_dir, "x": spec["x"]}
+
+    manager = JobManager(runner, str(tmp_path), max_workers=1)
+    blocking = manager.submit({"x": 1, "block": True})
+    queued = manager.submit({"x": 2})
+    assert manager.get(queued)["state"] == "queued"
+    assert manager.cancel(queued)
+    assert manager.cancel(blocking)
+    assert _wait(manager, blocking)["state"] == "cancelled"
+    assert _wait(manager, queued)["state"] == "cancelled"
+
+    done = _wait(manager, manager.submit({"x": 3}))
+    assert done["state"] == "done" and done["result"]["out_dir"] == str(tmp_path / done["id"])
+    manager.shutdown()
+
+def test_progress_board_versions_and_drops_stale_runs():
+    board = ProgressBoard()
+    old = board.start("run", {"status": "processing"})
+    etag, data, _ = board.get("run")
+    old.append("ratios", 0.9)
+    new_etag, data, body = board.wait("run", etag, timeout=1.0)
+    assert new_etag != etag and data["ratios"] == [0.9] and '"ratios": [0.9]' in body
+
+    new = board.start("run", {"status": "processing"})
+    old.update(status="done")  # superseded run must not overwrite the new one
+    assert board.get("run")[1] == {"status": "processing"}
+    new.update(status="done")
+    assert board.get("run")[1]["status"] == "done"
+
+    etag = board.get("run")[0]
+    start = time.perf_counter()
+    assert board.wait("run", etag, timeout=0.05)[0] == etag
+    assert time.perf_counter() - start >= 0.05
+
+def test_finished_jobs_are_evicted_with_their_directories(tmp_path):
+    runner = lambda spec, out_dir, cancel_event: {"status": "done"}
+    manager = JobManager(runner, str(tmp_path), max_workers=1, max_finished=2, max_age=60)
+    ids = []
+    for x in range(3):
+        ids.append(manager.submit({"x": x}))
+        manager.wait(ids[-1])
+    manager.evict()
+    assert manager.get(ids[0]) is None and not (tmp_path / ids[0]).exists()
+    assert manager.get(ids[2])["state"] == "done" and (tmp_path / ids[2]).exists()
+
+    shared = tmp_path / "shared"
+    manager.submit({}, job_id="fixed", out_dir=str(shared))
+    manager.wait("fixed")
+    assert "fixed" in manager.evict(now=time.time() + 120)
+    assert shared.exists()  # directories passed in by the caller are left alone
+    manager.shutdown()
+
+def test_board_gets_end_of_cancelled_queued_job_and_drops_evicted(tmp_path):
+    board = ProgressBoard()
+    release = threading.Event()
+    evicted = []
+
+    def runner(spec, out_dir, cancel_event):
+        release.wait()
+        return {"status": "done"}
+
+    manager = JobManager(runner, str(tmp_path), max_workers=1, board=board,
+                         on_evict=lambda job_id, out_dir: (evicted.append(job_id),
+                                                           board.drop(os.path.abspath(out_dir))))
+    manager.submit({})
+    queued = manager.submit({})
+    key = os.path.abspath(manager.output_dir(queued))
+    board.start(key, {"status": "processing", "ratios": [0.5]})
+    etag = board.get(key)[0]
+    assert manager.cancel(queued)
+    new_etag, data, _ = board.wait(key, etag, timeout=1.0)
+    assert new_etag != etag and data == {"status": "cancelled", "ratios": [0.5]}
+    release.set()
+
+    assert queued in manager.evict(now=time.time() + 7200)
+    assert evicted and board.get(key) == (None, None, None)
+    manager.shutdown()
@@ -0,0 +1,32 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal
+from qaoa_core import qaoa_expectation, qaoa_expectation_batch
+from optimizer_module import run_optimization
+from landscape import gamma_period, scan_landscape
+
+def test_gamma_period_from_cost_levels():
+    assert np.isclose(gamma_period(build_cost_diagonal(3, [(0, 1), (1, 2), (2, 0)])), np.pi)
+    assert np.isclose(gamma_period(build_cost_diagonal(4, [(0, 1), (1, 2), (2, 3)])), 2 * np.pi)
+    assert np.isclose(gamma_period(build_cost_diagonal(3, [(0, 1), (1, 2)], [1.0, 0.5])), 4 * np.pi)
+    assert gamma_period(build_cost_diagonal(3, [(0, 1), (1, 2)], [1.0, np.sqrt(2)])) is None
+
+def test_adaptive_scan_matches_exact_grid_with_few_evaluations():
+    H_P = build_cost_diagonal(5, [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (0, 2)])
+    scan = scan_landscape(H_P, p=1, resolution=200)
+    assert scan["values"].shape == (200, 200) and scan["time_reversal"]
+    assert scan["n_evals"] < 200 * 200 / 4
+    X, Y = np.meshgrid(scan["x"], scan["y"], indexing="ij")
+    exact = qaoa_expectation_batch(np.column_stack([X.ravel(), Y.ravel()]), 1, H_P)
+    assert np.abs(exact.reshape(X.shape) - scan["values"]).max() < 0.02
+    # the best located maximum is close to the true grid maximum and a good init
+    assert scan["optima_values"][0] > exact.max() - 0.02
+    params, cost, _ = run_optimization(1, H_P, None, method="L-BFGS-B", init=scan["optima"][0])
+    assert cost >= scan["optima_values"][0] - 1e-9
+
+def test_p2_slice_keeps_base_parameters():
+    H_P = build_cost_diagonal(4, [(0, 1), (1, 2), (2, 3), (3, 0)])
+    base = np.array([0.4, 0.7, 0.3, 0.2])
+    scan = scan_landscape(H_P, p=2, axes=(1, 3), base=base, resolution=60)
+    best = scan["optima"][0]
+    assert np.allclose(best[[0, 2]], base[[0, 2]])
+    assert np.isclose(scan["optima_values"][0], qaoa_expectation(best, 2, H_P))
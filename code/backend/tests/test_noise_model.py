@@ -0,0 +1,20 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal
+from qaoa_core import qaoa_expectation
+from noise_model import noisy_qaoa_expectation, noise_sweep
+
+def test_trajectories_agree_with_density_matrix():
+    H_P = build_cost_diagonal(3, [(0, 1), (1, 2), (2, 0)])
+    params = np.array([0.6, 0.4])
+    assert np.isclose(noisy_qaoa_expectation(params, 1, H_P, exact=True),
+                      qaoa_expectation(params, 1, H_P))
+    exact = noisy_qaoa_expectation(params, 1, H_P, 0.05, 0.1, exact=True)
+    sampled = noisy_qaoa_expectation(params, 1, H_P, 0.05, 0.1, trajectories=8000, seed=0)
+    assert abs(exact - sampled) < 0.03
+
+def test_noise_sweep_is_seeded_and_starts_noiseless():
+    H_P = build_cost_diagonal(3, [(0, 1), (1, 2), (2, 0)])
+    params = np.array([0.6, 0.4])
+    a = noise_sweep(params, 1, H_P, [0.0, 0.1], seed=3)
+    assert np.allclose(a, noise_sweep(params, 1, H_P, [0.0, 0.1], seed=3))
+    assert np.isclose(a[0], qaoa_expectation(params, 1, H_P))
@@ -1,6 +1,6 @@
 import numpy as np
-from hamiltonian import build_problem_hamiltonian, build_mixer_hamiltonian
-from optimizer_module import run_optimization
+from hamiltonian import build_problem_hamiltonian, build_mixer_hamiltonian, build_cost_diagonal
+from optimizer_module import run_optimization, run_depth_sweep, run_bayesian_opt
 
 def test_cobyla_optimization():
     n = 3
@@ -9,3 +9,61 @@ def test_cobyla_optimization():
     H_M = build_mixer_hamiltonian(n)
     params, cost, evals = run_optimization(1, H_P, H_M, method="COBYLA")
     assert cost > 0
+
+def test_lbfgs_with_adjoint_gradient():
+    n = 3
+    edges = [(0, 1), (1, 2), (2, 0)]
+    H_P = build_cost_diagonal(n, edges)
+    params, cost, evals = run_optimization(2, H_P, None, method="L-BFGS-B",
+                                           init=np.array([0.4, 0.3, 0.5, 0.2]))
+    assert cost > 1.9 and evals < 100
+
+def test_depth_sweep_warm_starts_improve_with_p():
+    H_P = build_cost_diagonal(4, [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)])
+    for strategy in ("interp", "fourier"):
+        sweep = run_depth_sweep(H_P, p_max=3, strategy=strategy, n_perturb=1, seed=0)
+        costs = [s["cost"] for s in sweep]
+        assert [s["p"] for s in sweep] == [1, 2, 3]
+        assert costs[2] >= costs[0] - 1e-6
+
+def test_bayesian_batches_and_warm_starts():
+    H_P = build_cost_diagonal(4, [(0, 1), (1, 2), (2, 3), (3, 0)])
+    calls = []
+    def batch_objective(X):
+        calls.append(len(X))
+        return np.array([-np.sum(np.sin(x)) for x in X])
+    history = []
+    x, value, nfev = run_bayesian_opt(None, 1, batch_objective=batch_objective,
+                                      n_calls=20, batch_size=5, history=history)
+    # 10-point initial design, then two rounds of 5 constant-liar proposals
+    assert calls == [10, 5, 5] and nfev == 20 and len(history) == 20
+    assert value == -min(y for _, y in history)
+    calls.clear()
+    run_bayesian_opt(None, 1, batch_objective=batch_objective, n_calls=5,
+                     n_initial_points=0, history=history)
+    assert calls == [5] and len(history) == 25
+    params, cost, _ = run_optimization(1, H_P, None, method="Bayesian")
+    assert cost > 2.0
+
+def test_bayesian_without_initial_design_starts_from_one_random_point():
+    calls = []
+    def batch_objective(X):
+        calls.append(len(X))
+        return np.array([-np.sum(np.sin(x)) for x in X])
+    _, _, nfev = run_bayesian_opt(None, 1, batch_objective=batch_objective, n_calls=4,
+                                  n_initial_points=0, batch_size=2)
+    assert calls == [1, 2, 1] and nfev == 4
+
+def test_bayesian_fits_hyperparameters_once_per_refit_round(monkeypatch):
+    from skopt.learning import GaussianProcessRegressor
+    fit = GaussianProcessRegressor.fit
+    searches = []
+    def counting_fit(self, X, y):
+        if self.optimizer is not None:
+            searches.append(len(X))
+        return fit(self, X, y)
+    monkeypatch.setattr(GaussianProcessRegressor, "fit", counting_fit)
+    objective = lambda X: np.array([-np.sum(np.sin(x)) for x in X])
+    run_bayesian_opt(None, 1, batch_objective=objective, n_calls=25, batch_size=5, refit_every=2)
+    # rounds 0 and 2 of three refit, on the real observations only
+    assert searches == [10, 20]
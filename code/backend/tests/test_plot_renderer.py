@@ -0,0 +1,31 @@
+import os
+import numpy as np
+from plot_renderer import PlotRenderer, plot_key, render_plot
+
+def test_render_reuses_cached_image(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    kwargs = {"noise_levels": [0.0, 0.1], "ratios": [1.0, 0.8]}
+    first = render_plot("noise_sensitivity", kwargs, str(tmp_path / "a"), cache_dir)
+    second = render_plot("noise_sensitivity", kwargs, str(tmp_path / "b"), cache_dir)
+    assert os.path.exists(first) and os.path.exists(second)
+    assert len([f for f in os.listdir(cache_dir) if f.endswith(".png")]) == 1
+    assert plot_key("noise_sensitivity", kwargs) != plot_key("noise_sensitivity", {**kwargs, "ratios": [1.0, 0.7]})
+    assert plot_key("x", {"a": np.arange(3)}) != plot_key("x", {"a": np.arange(3.0)})
+
+def test_ensure_waits_for_pool_render(tmp_path):
+    renderer = PlotRenderer(max_workers=1, cache_dir=str(tmp_path / "cache"))
+    names = renderer.submit_all({"qaoa_vs_tqa": {"p_values": [1, 2], "ratios_qaoa": [0.7, 0.9],
+                                                 "ratios_tqa": [0.6, 0.8]}}, str(tmp_path))
+    assert renderer.ensure(str(tmp_path / names["qaoa_vs_tqa"]))
+    renderer.pool.shutdown()
+
+def test_finished_renders_are_not_kept(tmp_path):
+    renderer = PlotRenderer(max_workers=1, cache_dir=str(tmp_path / "cache"))
+    ready = []
+    names = renderer.submit_all({"noise_sensitivity": {"noise_levels": [0.0], "ratios": [1.0]}},
+                                str(tmp_path), on_ready=ready.append)
+    path = str(tmp_path / names["noise_sensitivity"])
+    assert renderer.ensure(path)
+    renderer.pool.shutdown()  # runs the done callbacks
+    assert ready == ["noise_sensitivity"] and not renderer.rendering(path)
+    assert renderer.pending == {} and renderer.specs == {}
@@ -0,0 +1,12 @@
+from hamiltonian import build_cost_diagonal
+from portfolio import OptimizerPortfolio
+
+def test_portfolio_runs_all_jobs_and_reports_timing():
+    H_P = build_cost_diagonal(3, [(0, 1), (1, 2), (2, 0)])
+    with OptimizerPortfolio(H_P, max_workers=2) as portfolio:
+        results = portfolio.run(1, methods=("COBYLA", "L-BFGS-B"), n_random=2, seed=0)
+        assert len(results) == 6
+        assert all(r["nfev"] > 0 and r["time"] > 0 for r in results)
+        early = list(portfolio.iter_results(1, methods=("L-BFGS-B",), n_random=8,
+                                            seed=1, target_ratio=0.0))
+        assert len(early) == 1
@@ -0,0 +1,56 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal, build_mixer_hamiltonian
+from qaoa_core import (qaoa_state, qaoa_expectation, qaoa_expectation_and_gradient,
+                       qaoa_expectation_batch, StateWorkspace)
+
+def test_tensor_mixer_matches_dense_expm():
+    n = 4
+    edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+    H_P = build_cost_diagonal(n, edges)
+    H_M = build_mixer_hamiltonian(n)
+    params = np.array([0.3, 1.1, 0.7, 0.2])
+    psi_fast = qaoa_state(params, 2, H_P, H_M)
+    psi_dense = qaoa_state(params, 2, H_P, H_M, dense_mixer=True)
+    assert np.allclose(psi_fast, psi_dense)
+    assert np.isclose(qaoa_expectation(params, 2, H_P),
+                      qaoa_expectation(params, 2, H_P, H_M, dense_mixer=True))
+
+def test_adjoint_gradient_matches_finite_differences():
+    n = 4
+    edges = [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)]
+    H_P = build_cost_diagonal(n, edges, weights=[1.0, 0.5, 2.0, 1.0, 1.5])
+    H_M = build_mixer_hamiltonian(n)
+    params = np.array([0.3, 1.1, 0.4, 0.7, 0.2, 0.9])
+    eps = 1e-6
+    fd = np.array([
+        (qaoa_expectation(params + eps * e, 3, H_P) - qaoa_expectation(params - eps * e, 3, H_P)) / (2 * eps)
+        for e in np.eye(6)
+    ])
+    for dense in (False, True):
+        value, grad = qaoa_expectation_and_gradient(params, 3, H_P, H_M, dense_mixer=dense)
+        assert np.isclose(value, qaoa_expectation(params, 3, H_P))
+        assert np.allclose(grad, fd, atol=1e-5)
+
+def test_batch_expectation_matches_single_calls():
+    n = 4
+    H_P = build_cost_diagonal(n, [(0, 1), (1, 2), (2, 3), (3, 0)])
+    batch = np.random.default_rng(0).uniform(0, np.pi, (7, 4))
+    values = qaoa_expectation_batch(batch, 2, H_P, max_bytes=16 * 2**n * 3 * 2)
+    assert np.allclose(values, [qaoa_expectation(x, 2, H_P) for x in batch])
+
+def test_workspace_matches_reference_in_both_precisions():
+    n = 5
+    edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0), (0, 2)]
+    H_P = build_cost_diagonal(n, edges, weights=[1.0, 2.0, 1.0, 0.5, 1.0, 1.5])
+    params = np.array([0.3, 1.1, 0.4, 0.7, 0.2, 0.9])
+    value, grad = qaoa_expectation_and_gradient(params, 3, H_P)
+    for dtype, rtol in ((np.complex128, 1e-12), (np.complex64, 1e-5)):
+        ws = StateWorkspace(H_P, dtype=dtype)
+        assert ws.state(params, 3).dtype == dtype
+        assert np.allclose(ws.state(params, 3), qaoa_state(params, 3, H_P), atol=10 * rtol)
+        # repeated calls reuse the buffers and give the same answer
+        assert np.isclose(ws.expectation(params, 3), value, rtol=rtol)
+        assert np.isclose(ws.expectation(params, 3), value, rtol=rtol)
+        ws_value, ws_grad = ws.expectation_and_gradient(params, 3)
+        assert np.isclose(ws_value, value, rtol=rtol)
+        assert np.allclose(ws_grad, grad, rtol=10 * rtol, atol=10 * rtol)
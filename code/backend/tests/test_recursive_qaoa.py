@@ -0,0 +1,23 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal
+from qaoa_core import zz_correlations
+from recursive_qaoa import eliminate_qubit, recursive_qaoa
+
+def test_zz_correlations_of_basis_state():
+    psi = np.zeros(8, dtype=complex)
+    psi[0b010] = 1.0
+    M = zz_correlations(psi)
+    assert np.allclose(M, [[1, -1, 1], [-1, 1, -1], [1, -1, 1]])
+
+def test_eliminate_qubit_matches_constrained_diagonal():
+    diag = build_cost_diagonal(4, [(0, 1), (1, 2), (2, 3), (3, 0), (0, 2)], [1, 2, 3, 4, 5])
+    reduced = eliminate_qubit(diag, 1, 3, -1)
+    # z_3 = -z_1: keep states with bit3 != bit1, drop bit 3
+    expected = [diag[x] for x in range(16) if ((x >> 2) & 1) != (x & 1)]
+    assert np.allclose(reduced, expected)
+
+def test_rqaoa_finds_max_cut_of_ring():
+    n = 8
+    edges = [(i, (i + 1) % n) for i in range(n)]
+    result = recursive_qaoa(n, edges, p=1, n_cutoff=3)
+    assert result["cut"] == 8.0 and len(result["fixed"]) == n - 3
@@ -0,0 +1,32 @@
+import numpy as np
+from hamiltonian import build_cost_diagonal
+from result_cache import ResultCache, graph_fingerprint, cached_optimization
+
+def test_cache_hit_and_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    edges = [(0, 1), (1, 2), (2, 0)]
+    key = graph_fingerprint(3, edges)
+    assert key == graph_fingerprint(3, [(2, 0), (1, 0), (2, 1)])
+    H_P = build_cost_diagonal(3, edges)
+    init = np.array([0.4, 0.3])
+    first = cached_optimization(cache, key, 1, H_P, None, "COBYLA", init)
+    second = cached_optimization(cache, key, 1, H_P, None, "COBYLA", init)
+    assert not first[3] and second[3]
+    assert np.allclose(first[0], second[0]) and first[2] == second[2]
+    cache.put("a", {"cost": 1.0})
+    cache.put("b", {"cost": 2.0})
+    assert len(cache) == 2 and cache.get("a") is not None
+
+def test_key_changes_with_code_version_and_method_options(tmp_path, monkeypatch):
+    import result_cache
+    import optimizer_module
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    H_P = build_cost_diagonal(3, [(0, 1), (1, 2)])
+    key = graph_fingerprint(3, [(0, 1), (1, 2)])
+    init = np.array([0.4, 0.3])
+    assert not cached_optimization(cache, key, 1, H_P, None, "COBYLA", init)[3]
+    assert cached_optimization(cache, key, 1, H_P, None, "COBYLA", init)[3]
+    monkeypatch.setitem(optimizer_module.METHOD_OPTIONS, "COBYLA", {"maxiter": 5, "tol": 1e-4})
+    assert not cached_optimization(cache, key, 1, H_P, None, "COBYLA", init)[3]
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", result_cache.CACHE_VERSION + 1)
+    assert not cached_optimization(cache, key, 1, H_P, None, "COBYLA", init)[3]
@@ -0,0 +1,18 @@
+import numpy as np
+from sampling import BitstringSampler, counts_statistics, sample_qaoa
+
+def test_cvar_takes_best_fraction_of_shots():
+    cost = np.array([0.0, 1.0, 2.0, 3.0])
+    counts = np.array([4, 3, 2, 1])
+    stats = counts_statistics(counts, cost, alpha=0.2)
+    assert np.isclose(stats["mean"], 1.0)
+    assert np.isclose(stats["cvar"], 2.5)
+    assert stats["best_cut"] == 3.0 and stats["best_state"] == 3
+
+def test_seeded_sampling_is_reproducible():
+    psi = np.array([0.6, 0.0, 0.8j, 0.0])
+    a = BitstringSampler(psi, seed=7).sample(1000)
+    assert np.array_equal(a, BitstringSampler(psi, seed=7).sample(1000))
+    assert set(np.unique(a)) <= {0, 2}
+    stats = sample_qaoa(psi, np.array([1.0, 0.0, 3.0, 0.0]), shots=20000, seed=1)
+    assert stats["counts"].sum() == 20000 and abs(stats["mean"] - 2.28) < 0.05
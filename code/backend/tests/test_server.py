@@ -0,0 +1,10 @@
+import pytest
+from server import parse_job_spec
+
+def test_parse_job_spec_defaults_and_errors():
+    spec = parse_job_spec({"edges": [[0, 1], [1, 2]], "p_values": [2, 1]})
+    assert spec["n"] == 3 and spec["edges"] == [(0, 1), (1, 2)] and spec["p_values"] == [1, 2]
+    for bad in ([1, 2], {"edges": 5}, {"edges": [[0]]}, {"edges": [["a", 1]]},
+                {"weights": 3}, {"p_values": None}, {"noise_levels": 0.1}):
+        with pytest.raises(ValueError):
+            parse_job_spec(bad)
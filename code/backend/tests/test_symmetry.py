@@ -1,7 +1,37 @@
+import itertools
 import numpy as np
-from symmetry_module import reduce_hilbert_space
+from hamiltonian import build_cost_diagonal
+from qaoa_core import qaoa_state, qaoa_expectation_and_gradient
+from symmetry_module import (reduce_hilbert_space, z2_reduction, orbit_reduction, graph_automorphisms,
+                             automorphism_generators, basis_orbits)
 
 def test_symmetry_reduction_identity():
     H_P = np.diag(np.arange(8))
     H_reduced, _ = reduce_hilbert_space(H_P, H_P, lambda idx: idx % 2 == 0)
     assert H_reduced.shape[0] < H_P.shape[0]
+
+def test_z2_and_orbit_reductions_match_full_simulation():
+    n = 5
+    edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 0)]
+    H_P = build_cost_diagonal(n, edges)
+    params = np.array([0.4, 0.9, 0.7, 0.3])
+    psi_full = qaoa_state(params, 2, H_P)
+    value, grad = qaoa_expectation_and_gradient(params, 2, H_P)
+    for cost_red, mixer in (z2_reduction(n, edges), orbit_reduction(n, edges)):
+        assert mixer.dim < 2**n
+        assert np.allclose(mixer.expand(qaoa_state(params, 2, cost_red, mixer)), psi_full)
+        v_red, g_red = qaoa_expectation_and_gradient(params, 2, cost_red, mixer)
+        assert np.isclose(v_red, value) and np.allclose(g_red, grad)
+
+def test_ring_automorphisms_form_dihedral_group():
+    autos = graph_automorphisms(6, [(i, (i + 1) % 6) for i in range(6)])
+    assert len(autos) == 11
+
+def test_generating_set_gives_the_same_orbits():
+    for n, edges in ((7, list(itertools.combinations(range(7), 2))),
+                     (8, [(i, j) for i in range(4) for j in range(4, 8)]),
+                     (6, [(i, (i + 1) % 6) for i in range(6)])):
+        generators = automorphism_generators(n, edges)
+        assert len(generators) < n * (n - 1) // 2 + 1
+        assert np.array_equal(basis_orbits(n, generators),
+                              basis_orbits(n, graph_automorphisms(n, edges, limit=10**5)))
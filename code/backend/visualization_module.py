@@ -3,51 +3,62 @@ import numpy as np
 import matplotlib
 matplotlib.use("Agg")  # headless backend (thread-safe for Flask)
 import matplotlib.pyplot as plt
-from qaoa_core import qaoa_expectation
-from adiabatic import simulate_continuous_adiabatic
+from landscape import scan_landscape
+from adiabatic import simulate_adiabatic_fast
+from instrumentation import timed
 
-os.makedirs("output/static", exist_ok=True)
+# default target is <repo>/output/static regardless of the working directory;
+# callers (server jobs, render workers) pass their own out_dir
+DEFAULT_OUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../output/static"))
+
+def _save(out_dir, filename):
+    os.makedirs(out_dir, exist_ok=True)
+    plt.savefig(os.path.join(out_dir, filename), dpi=120)
 
 # ---------- Energy Landscape ----------
-def plot_energy_landscape(H_P, H_M, p=1, gamma_range=(0, np.pi), beta_range=(0, np.pi), points=35):
+@timed()
+def plot_energy_landscape(H_P, H_M, p=1, gamma_range=None, beta_range=None, points=200,
+                          landscape=None, out_dir=DEFAULT_OUT_DIR):
     """
-    Plots ⟨C⟩(γ, β) as a heatmap for QAOA layer depth p=1.
-    Thread-safe, prevents invalid array shape errors.
+    Plots <C>(γ, β) of the first layer as a points x points heatmap with the
+    located maxima marked. By default the grid spans one symmetry period and
+    comes from landscape.scan_landscape (adaptive, far fewer simulations than
+    points^2); explicit ranges or a precomputed landscape can be passed.
+    Returns the landscape dict.
     """
-    gammas = np.linspace(*gamma_range, points)
-    betas = np.linspace(*beta_range, points)
-    Z = np.zeros((len(gammas), len(betas)))
-
-    for i, g in enumerate(gammas):
-        for j, b in enumerate(betas):
-            params = np.array([g, b])
-            try:
-                Z[i, j] = qaoa_expectation(params, p, H_P, H_M)
-            except Exception:
-                Z[i, j] = np.nan
-
-    if np.isnan(Z).any():
-        Z = np.nan_to_num(Z, nan=np.nanmean(Z[np.isfinite(Z)]))
+    if landscape is None:
+        ranges = None
+        if gamma_range is not None or beta_range is not None:
+            ranges = [gamma_range or (0, np.pi), beta_range or (0, np.pi / 2)]
+        landscape = scan_landscape(H_P, p, H_M, resolution=points, ranges=ranges)
+    Z, ((g0, g1), (b0, b1)) = landscape["values"], landscape["ranges"]
 
     plt.figure(figsize=(7, 5))
     im = plt.imshow(
         Z.T,
-        extent=[gamma_range[0], gamma_range[1], beta_range[0], beta_range[1]],
+        extent=[g0, g1, b0, b1],
         origin="lower",
         aspect="auto",
         interpolation="nearest"
     )
+    if len(landscape["optima"]):
+        ax0, ax1 = landscape["axes"]
+        plt.scatter(landscape["optima"][:, ax0], landscape["optima"][:, ax1],
+                    marker="x", color="white", label="local maxima")
+        plt.legend(loc="upper right")
     plt.xlabel(r"Gamma (γ)")
     plt.ylabel(r"Beta (β)")
     plt.title(r"QAOA Energy Landscape <C>(γ, β)")
     plt.colorbar(im, label="Expected Cost")
     plt.tight_layout()
-    plt.savefig("output/static/energy_landscape.png", dpi=120)
+    _save(out_dir, "energy_landscape.png")
     plt.close()
+    return landscape
 
 
 # ---------- Correlation Heatmap ----------
-def plot_correlation_heatmap(corrs, title="RQAOA Correlation Heatmap"):
+@timed()
+def plot_correlation_heatmap(corrs, title="RQAOA Correlation Heatmap", out_dir=DEFAULT_OUT_DIR):
     """
     Plot ⟨Z_i Z_j⟩ correlation matrix for visualization in RQAOA.
     """
@@ -68,12 +79,13 @@ def plot_correlation_heatmap(corrs, title="RQAOA Correlation Heatmap"):
         plt.ylabel("Qubit i")
     plt.title(title)
     plt.tight_layout()
-    plt.savefig("output/static/correlation_heatmap.png", dpi=120)
+    _save(out_dir, "correlation_heatmap.png")
     plt.close()
 
 
 # ---------- Noise Sensitivity ----------
-def plot_noise_vs_ratio(noise_levels, ratios):
+@timed()
+def plot_noise_vs_ratio(noise_levels, ratios, out_dir=DEFAULT_OUT_DIR):
     """
     Plot performance degradation due to depolarizing noise.
     """
@@ -84,16 +96,17 @@ def plot_noise_vs_ratio(noise_levels, ratios):
     plt.title("Noise Sensitivity of QAOA")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig("output/static/noise_sensitivity.png", dpi=120)
+    _save(out_dir, "noise_sensitivity.png")
     plt.close()
 
 
 # ---------- Fidelity vs Time (Adiabatic Evolution) ----------
-def plot_adiabatic_fidelity(H_P, H_M, T=10.0, steps=200):
+@timed()
+def plot_adiabatic_fidelity(H_P, H_M, T=10.0, steps=200, out_dir=DEFAULT_OUT_DIR):
     """
-    Plot the ground-state fidelity over time for adiabatic evolution.
+    Plot the optimal-subspace fidelity over time for adiabatic evolution.
     """
-    times, fidelities, _ = simulate_continuous_adiabatic(H_P, H_M, T=T, steps=steps)
+    times, fidelities, _ = simulate_adiabatic_fast(H_P, T=T, steps=steps)
     plt.figure(figsize=(7, 4))
     plt.plot(times, fidelities, '-')
     plt.xlabel("Time")
@@ -101,12 +114,13 @@ def plot_adiabatic_fidelity(H_P, H_M, T=10.0, steps=200):
     plt.title("Continuous Adiabatic Evolution: Fidelity vs Time")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig("output/static/adiabatic_fidelity.png", dpi=120)
+    _save(out_dir, "adiabatic_fidelity.png")
     plt.close()
 
 
 # ---------- QAOA vs TQA ----------
-def plot_qaoa_vs_tqa(p_values, ratios_qaoa, ratios_tqa):
+@timed()
+def plot_qaoa_vs_tqa(p_values, ratios_qaoa, ratios_tqa, out_dir=DEFAULT_OUT_DIR):
     """
     Compare optimized QAOA performance with TQA baseline.
     """
@@ -120,12 +134,13 @@ def plot_qaoa_vs_tqa(p_values, ratios_qaoa, ratios_tqa):
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.savefig("output/static/qaoa_vs_tqa.png", dpi=120)
+    _save(out_dir, "qaoa_vs_tqa.png")
     plt.close()
 
 
 # ---------- Parameter Schedules ----------
-def plot_param_schedules(gammas, betas, title="Optimized parameter schedules"):
+@timed()
+def plot_param_schedules(gammas, betas, title="Optimized parameter schedules", out_dir=DEFAULT_OUT_DIR):
     """
     Plot optimized γ_k and β_k parameter evolution across QAOA layers.
     """
@@ -140,5 +155,5 @@ def plot_param_schedules(gammas, betas, title="Optimized parameter schedules"):
     plt.grid(True)
     plt.legend()
     plt.tight_layout()
-    plt.savefig("output/static/params_schedule.png", dpi=120)
+    _save(out_dir, "params_schedule.png")
     plt.close()
\ No newline at end of file
@@ -21,8 +21,8 @@ document.addEventListener("DOMContentLoaded", () => {
 
     try {
       const resetRes = await fetch(`${BACKEND}/reset`, { method: "POST" });
+      // /reset returns once the previous run has stopped; no need to wait here
       if (!resetRes.ok) throw new Error("reset failed");
-      await new Promise(r => setTimeout(r, 800));
     } catch (err) {
       summary.textContent = "Reset failed.";
       console.error(err);
@@ -30,6 +30,7 @@ document.addEventListener("DOMContentLoaded", () => {
       return;
     }
 
+    clearPlots();
     summary.textContent = "Starting computation…";
     try {
       const r = await fetch(`${BACKEND}/results`);
@@ -37,9 +38,10 @@ document.addEventListener("DOMContentLoaded", () => {
       const j = await r.json();
       if (j.status === "processing") {
         summary.textContent = "Processing…";
-        pollStatus();
+        followProgress();
       } else if (j.status === "done") {
-        simulateWaitThenShow(j);
+        if (update(j)) finishRun();
+        else followProgress();
       } else {
         summary.textContent = `Unexpected response: ${JSON.stringify(j)}`;
         finishRun();
@@ -51,23 +53,43 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // Partial results stream in from /events (Server-Sent Events); without
+  // EventSource, or if the stream fails, /status is long-polled with ETags.
+  function followProgress() {
+    if (!window.EventSource) {
+      pollStatus();
+      return;
+    }
+    const source = new EventSource(`${BACKEND}/events`);
+    source.onmessage = e => {
+      if (update(JSON.parse(e.data))) {
+        source.close();
+        finishRun();
+      }
+    };
+    source.onerror = () => {
+      source.close();
+      if (isRunning) pollStatus();
+    };
+  }
+
+  let statusEtag = null;
   async function pollStatus() {
     try {
-      const resp = await fetch(`${BACKEND}/status`);
-      if (!resp.ok) throw new Error("status failed");
-      const data = await resp.json();
-
-      if (data.status === "processing") {
-        summary.textContent = summary.textContent.endsWith("...") ? "Processing" : summary.textContent + ".";
-        setTimeout(pollStatus, 1500);
+      const headers = statusEtag ? { "If-None-Match": statusEtag } : {};
+      const resp = await fetch(`${BACKEND}/status?wait=25`, { headers, cache: "no-store" });
+      if (resp.status === 304) {
+        pollStatus();
         return;
       }
-      if (data.status === "done") {
-        simulateWaitThenShow(data);
+      if (!resp.ok) throw new Error("status failed");
+      statusEtag = resp.headers.get("ETag");
+      if (update(await resp.json())) {
+        finishRun();
         return;
       }
-      summary.textContent = "Unexpected backend status.";
-      finishRun();
+      // the server holds unchanged requests itself; without an ETag fall back to plain polling
+      setTimeout(pollStatus, statusEtag ? 0 : 1500);
     } catch (err) {
       summary.textContent = "Error polling backend.";
       console.error(err);
@@ -75,97 +97,102 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
-  async function waitForPlots(data) {
-    const plotKeys = Object.keys(data.plots || {});
-    const maxWait = 10000;
-    const start = Date.now();
-    while (Date.now() - start < maxWait) {
-      const ok = await Promise.all(
-        plotKeys.map(k =>
-          fetch(`${BACKEND}${data.plots[k]}?t=${Date.now()}`, { method: "HEAD" })
-            .then(r => r.ok)
-            .catch(() => false)
-        )
-      );
-      if (ok.every(Boolean)) return true;
-      await new Promise(r => setTimeout(r, 500));
+  // Render whatever part of the results has arrived; returns true once the
+  // run is over (all numbers and all plots are in, or it failed).
+  function update(data) {
+    if (data.status === "error") {
+      summary.textContent = `Backend error: ${data.message}`;
+      return true;
+    }
+    if (data.status === "cancelled") {
+      summary.textContent = "Run cancelled.";
+      return true;
     }
-    return false;
+    renderSummary(data);
+    if (data.p_values) renderCharts(data);
+    renderPlots(data);
+    if (data.status !== "done") return false;
+    const ready = data.plots_ready || [];
+    return Object.keys(data.plots || {}).every(k => ready.includes(k));
   }
 
-  function simulateWaitThenShow(data) {
-    const execSeconds = Math.max(1.0, Number(data.execution_time || 3));
-    const total = Math.max(2000, Math.round(execSeconds * 1000));
-    let elapsed = 0;
-    const step = 250;
-    summary.textContent = "Finalizing calculations... 0%";
-    const timer = setInterval(() => {
-      elapsed += step;
-      const pct = Math.min(100, Math.round((elapsed / total) * 100));
-      summary.textContent = `Finalizing calculations... ${pct}%`;
-      if (elapsed >= total) {
-        clearInterval(timer);
-        waitForPlots(data).then(() => {
-          renderResults(data);
-          finishRun();
-        });
-      }
-    }, step);
-  }
+  const fmt = values => values.map(v => (v === null ? "…" : Number(v).toFixed(3))).join(", ");
 
-  function renderResults(data) {
+  function renderSummary(data) {
+    const qaoa = data.performance_ratios || [];
+    const tqa = data.tqa_ratios || [];
+    if (data.status === "done") {
+      summary.textContent =
+        `Best Approximation Ratio: ${Number(data.best_ratio).toFixed(3)}\n` +
+        `Execution Time: ${Number(data.execution_time).toFixed(2)} s\n` +
+        `Best Optimizer: ${data.optimizer}\n\n` +
+        `QAOA Ratios: ${fmt(qaoa)}\n` +
+        `TQA Ratios: ${fmt(tqa)}`;
+      return;
+    }
+    if (!data.p_values) {
+      summary.textContent = "Processing…";
+      return;
+    }
     summary.textContent =
-      `Best Approximation Ratio: ${Number(data.best_ratio).toFixed(3)}\n` +
-      `Execution Time: ${Number(data.execution_time).toFixed(2)} s\n` +
-      `Best Optimizer: ${data.optimizer}\n\n` +
-      `QAOA Ratios: ${data.performance_ratios.map(v => Number(v).toFixed(3)).join(", ")}\n` +
-      `TQA Ratios: ${data.tqa_ratios.map(v => Number(v).toFixed(3)).join(", ")}`;
-
-    if (window.qaoaChartInstance) window.qaoaChartInstance.destroy();
-    if (window.tqaChartInstance) window.tqaChartInstance.destroy();
-    if (window.optChartInstance) window.optChartInstance.destroy();
+      `Processing… depth ${qaoa.length}/${data.p_values.length} done` +
+      (data.stage === "analysis" ? ", running RQAOA and noise analysis" : "") + "\n\n" +
+      (qaoa.length ? `Best Approximation Ratio so far: ${Number(data.best_ratio).toFixed(3)}\n` : "") +
+      `QAOA Ratios: ${fmt(qaoa)}\n` +
+      `TQA Ratios: ${fmt(tqa)}`;
+  }
 
-    // QAOA chart
-    const qctx = qaoaChartCanvas.getContext("2d");
-    window.qaoaChartInstance = new Chart(qctx, {
+  function barChart(name, canvas, labels, dataset) {
+    const chart = window[name];
+    if (chart && chart.data.labels.join() === labels.join()) {
+      chart.data.datasets[0].data = dataset.data;
+      chart.update();
+      return;
+    }
+    if (chart) chart.destroy();
+    window[name] = new Chart(canvas.getContext("2d"), {
       type: "bar",
-      data: { labels: data.p_values, datasets: [{ label: "QAOA", data: data.performance_ratios }] },
+      data: { labels, datasets: [dataset] },
       options: { scales: { y: { beginAtZero: true, max: 1.05 } } }
     });
+  }
 
-    // TQA chart
-    const tctx = tqaChartCanvas.getContext("2d");
-    window.tqaChartInstance = new Chart(tctx, {
-      type: "bar",
-      data: { labels: data.p_values, datasets: [{ label: "TQA", data: data.tqa_ratios }] },
-      options: { scales: { y: { beginAtZero: true, max: 1.05 } } }
-    });
+  function renderCharts(data) {
+    barChart("qaoaChartInstance", qaoaChartCanvas, data.p_values,
+             { label: "QAOA", data: data.performance_ratios || [] });
+    barChart("tqaChartInstance", tqaChartCanvas, data.p_values,
+             { label: "TQA", data: data.tqa_ratios || [] });
+    barChart("optChartInstance", optimizerChartCanvas, data.optimizer_labels || [],
+             { label: "Optimizer Scores", data: data.optimizer_scores || [],
+               backgroundColor: "rgba(0,255,0,0.6)" });
+  }
 
-    // Optimizer performance chart
-    const octx = optimizerChartCanvas.getContext("2d");
-    window.optChartInstance = new Chart(octx, {
-      type: "bar",
-      data: {
-        labels: data.optimizer_labels,
-        datasets: [
-          { label: "Optimizer Scores", data: data.optimizer_scores, backgroundColor: "rgba(0,255,0,0.6)" }
-        ]
-      },
-      options: { scales: { y: { beginAtZero: true, max: 1.05 } } }
+  // Load static image plots as each one finishes rendering
+  const PLOT_IMAGES = {
+    energy_landscape: "energyPlot",
+    correlation_heatmap: "corrPlot",
+    noise_sensitivity: "noisePlot",
+    adiabatic_fidelity: "fidelityPlot",
+    qaoa_vs_tqa: "qaoaTqaPlot",
+    params_schedule: "paramsPlot",
+  };
+  let shownPlots = new Set();
+
+  function renderPlots(data) {
+    (data.plots_ready || []).forEach(k => {
+      const el = document.getElementById(PLOT_IMAGES[k]);
+      if (!el || shownPlots.has(k) || !(data.plots || {})[k]) return;
+      el.src = `${BACKEND}/output/static/${data.plots[k]}?t=${Date.now()}`;
+      shownPlots.add(k);
     });
+  }
 
-    // Load static image plots
-    const map = {
-      energy_landscape: "energyPlot",
-      correlation_heatmap: "corrPlot",
-      noise_sensitivity: "noisePlot",
-      adiabatic_fidelity: "fidelityPlot",
-      qaoa_vs_tqa: "qaoaTqaPlot",
-      params_schedule: "paramsPlot",
-    };
-    Object.entries(map).forEach(([k, v]) => {
-      const el = document.getElementById(v);
-      if (el && data.plots[k]) el.src = `${BACKEND}/../output/static/${data.plots[k]}?t=${Date.now()}`;
+  function clearPlots() {
+    shownPlots = new Set();
+    statusEtag = null;
+    Object.values(PLOT_IMAGES).forEach(id => {
+      const el = document.getElementById(id);
+      if (el) el.removeAttribute("src");
     });
   }
 